@@ -0,0 +1,221 @@
+"""Admission control: keep one hot session from starving every other request.
+
+Three layers, all per worker process:
+  * ``ConcurrencyGate`` - a fixed number of in-flight requests (sized to the
+    threadpool). Writes may only take ``write_capacity`` of them, so reads always
+    have headroom; when a slot frees up, queued reads are admitted before queued
+    writes. The wait queue is bounded in length and in time; past either limit
+    the request is shed with 503 + Retry-After; a read arriving at a full queue
+    displaces the newest queued write instead.
+  * per-session token buckets, checked by the endpoint once it knows the
+    session id (429 + Retry-After).
+  * per-route token buckets for write routes, taken in the same check but only
+    after the session bucket passed, so a session that is over its own limit
+    cannot drain the route budget of every other session (429 + Retry-After).
+"""
+import asyncio, math, threading, time
+from collections import OrderedDict, deque
+from typing import Dict, Tuple
+
+
+class Shed(Exception):
+    def __init__(self, status: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()     # taken from threadpool threads (sync endpoints)
+
+    def take(self) -> float:
+        """0 if a token was taken, otherwise seconds until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+
+class BucketMap:
+    """Token bucket per key; least recently used keys are dropped past max_keys."""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        with self._lock:
+            b = self._buckets.get(key)
+            if b is None:
+                b = self._buckets[key] = TokenBucket(self.rate, self.burst)
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return b.take()
+
+    def refund(self, key: str):
+        with self._lock:
+            b = self._buckets.get(key)
+            if b is not None:
+                b.refund()
+
+
+class ConcurrencyGate:
+    def __init__(self, capacity: int, write_capacity: int, max_queue: int, max_wait: float):
+        self.capacity = capacity
+        self.write_capacity = min(write_capacity, capacity)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_use = {"read": 0, "write": 0}
+        self.waiters: Dict[str, deque] = {"read": deque(), "write": deque()}
+
+    def _can(self, kind: str) -> bool:
+        if self.in_use["read"] + self.in_use["write"] >= self.capacity:
+            return False
+        return kind == "read" or self.in_use["write"] < self.write_capacity
+
+    def queued(self) -> int:
+        return len(self.waiters["read"]) + len(self.waiters["write"])
+
+    async def acquire(self, kind: str):
+        # don't jump the queue: only take a slot directly if nobody of this priority waits
+        blocked = self.waiters["read"] or (kind == "write" and self.waiters["write"])
+        if not blocked and self._can(kind):
+            self.in_use[kind] += 1
+            return
+        if self.queued() >= self.max_queue and not self._displace(kind):
+            raise Shed(503, "queue_full", self.max_wait)
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters[kind].append(fut)
+        try:
+            await asyncio.wait_for(fut, self.max_wait)
+        except asyncio.TimeoutError:
+            self._forget(kind, fut)
+            raise Shed(503, "queue_timeout", self.max_wait)
+        except BaseException:
+            # client went away (task cancelled) or we were displaced
+            self._forget(kind, fut)
+            raise
+        # slot was handed over by release()
+
+    def _displace(self, kind: str) -> bool:
+        """Reads shed the most recently queued (still waiting) write instead of being shed."""
+        q = self.waiters["write"]
+        while kind == "read" and q:
+            fut = q.pop()
+            if not fut.done():
+                fut.set_exception(Shed(503, "displaced", self.max_wait))
+                return True
+        return False
+
+    def _forget(self, kind: str, fut):
+        try:
+            self.waiters[kind].remove(fut)
+        except ValueError:
+            pass
+        if fut.done() and not fut.cancelled() and fut.exception() is None:   # granted just as we gave up
+            self.release(kind)
+
+    def release(self, kind: str):
+        self.in_use[kind] -= 1
+        self._wake()
+
+    def _wake(self):
+        for kind in ("read", "write"):           # reads first
+            q = self.waiters[kind]
+            while q and self._can(kind):
+                fut = q.popleft()
+                if fut.done():                    # timed out / cancelled / displaced meanwhile
+                    continue
+                self.in_use[kind] += 1
+                fut.set_result(None)
+
+
+class AdmissionController:
+    def __init__(self, capacity: int, write_capacity: int, max_queue: int, max_wait: float,
+                 route_limits: Dict[str, Tuple[float, float]], session_rate: float, session_burst: float,
+                 exempt: Tuple[str, ...] = ()):
+        self.gate = ConcurrencyGate(capacity, write_capacity, max_queue, max_wait)
+        self.routes = {path: TokenBucket(rate, burst) for path, (rate, burst) in route_limits.items()}
+        self.sessions = BucketMap(session_rate, session_burst)
+        self.exempt = exempt
+        self.admitted: Dict[str, int] = {}
+        self.shed: Dict[str, int] = {}        # "<path> <reason>" -> count
+
+    def _count_shed(self, path: str, reason: str):
+        k = f"{path} {reason}"
+        self.shed[k] = self.shed.get(k, 0) + 1
+
+    def check_session(self, path: str, session_id: str):
+        wait = self.sessions.take(session_id)
+        if wait:
+            self._count_shed(path, "session_rate")
+            raise Shed(429, "session_rate", wait)
+        bucket = self.routes.get(path)
+        wait = bucket.take() if bucket else 0
+        if wait:
+            # the session did not get through, so it keeps its token
+            self.sessions.refund(session_id)
+            self._count_shed(path, "route_rate")
+            raise Shed(429, "route_rate", wait)
+
+    def stats(self) -> dict:
+        g = self.gate
+        return {"in_flight": dict(g.in_use), "queued": {k: len(v) for k, v in g.waiters.items()},
+                "capacity": g.capacity, "write_capacity": g.write_capacity,
+                "admitted": dict(self.admitted), "shed": dict(self.shed),
+                "shed_total": sum(self.shed.values())}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware; GET/HEAD are reads, everything else is a write."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.ctl = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+        path = scope["path"]
+        # probes and long-lived streams must not hold (or wait for) a slot
+        if path in self.ctl.exempt or path.endswith("/stream"):
+            return await self.app(scope, receive, send)
+        kind = "read" if scope["method"] in ("GET", "HEAD") else "write"
+        try:
+            await self.ctl.gate.acquire(kind)
+        except Shed as e:
+            self.ctl._count_shed(path, e.reason)
+            return await _reject(send, e)
+        self.ctl.admitted[kind] = self.ctl.admitted.get(kind, 0) + 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.ctl.gate.release(kind)
+
+
+async def _reject(send, e: Shed):
+    body = ('{"detail":"server busy (%s), retry later"}' % e.reason).encode()
+    await send({"type": "http.response.start", "status": e.status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"retry-after", str(e.retry_after).encode()),
+                            (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,93 @@
+"""In-process pub/sub for the founder dashboard live feed (SSE).
+
+Writers (sync endpoints running in the threadpool) call ``publish``; each SSE
+connection owns a ``Subscriber`` with a bounded asyncio queue on the event loop.
+A subscriber that falls behind does not slow down writers or other subscribers:
+when its buffer is full the backlog is dropped and a single ``resync`` event is
+queued, telling the client to refetch /founder_sessions once and carry on.
+Every subscription also starts with a ``resync``: events published while the
+client was disconnected (or before its snapshot) are not replayed, so it
+refetches once it is subscribed and applies deltas from there.
+"""
+import asyncio, itertools, threading
+from typing import Dict, Optional, Set
+
+
+class Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, founder_email: str,
+                 session_id: Optional[str], buffer_size: int):
+        self.loop = loop
+        self.founder_email = founder_email
+        self.session_id = session_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.resyncs = 0
+
+    def wants(self, event: dict) -> bool:
+        return self.session_id is None or event.get("session_id") == self.session_id
+
+    def _offer(self, event: dict):
+        # runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "reason": "buffer_full"})
+            self.resyncs += 1
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class ResponseFeed:
+    def __init__(self, buffer_size: int = 64):
+        self.buffer_size = buffer_size
+        self._subs: Dict[str, Set[Subscriber]] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self, founder_email: str, session_id: Optional[str] = None) -> Subscriber:
+        """Must be called from the event loop that will consume the subscriber."""
+        sub = Subscriber(asyncio.get_running_loop(), founder_email, session_id, self.buffer_size)
+        sub.queue.put_nowait({"type": "resync", "reason": "subscribed"})
+        with self._lock:
+            self._subs.setdefault(founder_email, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            subs = self._subs.get(sub.founder_email)
+            if subs is None:
+                return
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.founder_email]
+
+    def has_subscribers(self, founder_email: str) -> bool:
+        return founder_email in self._subs
+
+    def publish(self, founder_email: str, event: dict):
+        """Thread-safe; never blocks the caller."""
+        with self._lock:
+            targets = [s for s in self._subs.get(founder_email, ()) if s.wants(event)]
+        if not targets:
+            return
+        event = {**event, "seq": next(self._seq)}
+        self.published += 1
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, event)
+            except RuntimeError:
+                # loop already closed; the connection's finally block will unsubscribe it
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            subs = [s for group in self._subs.values() for s in group]
+        return {
+            "subscribers": len(subs),
+            "founders": len({s.founder_email for s in subs}),
+            "published": self.published,
+            "resyncs": sum(s.resyncs for s in subs),
+        }
@@ -1,25 +1,126 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from contextlib import asynccontextmanager
 from enum import Enum
 from datetime import datetime
 from dotenv import load_dotenv
-from supabase import create_client, Client
-from Crypto.Hash import keccak
-import hashlib, json, os, glob, uuid
+import asyncio, hashlib, json, os, glob, threading, time, uuid
 from uuid import uuid4
+from .feed import ResponseFeed
+from .search import SearchIndex
+from .shared_cache import make_cache
+from .admission import AdmissionController, AdmissionMiddleware, Shed
+from . import themes
+
+if TYPE_CHECKING:  # supabase / pycryptodome are imported lazily, see _ensure_sb() and _keccak_hex()
+    from supabase import Client
 
 
 # -----------------------------------------------------------------------------
-# App & CORS
+# Config
 # -----------------------------------------------------------------------------
-app = FastAPI(title="Verity Backend", version="0.3.0")
-
 load_dotenv()
 SB_URL = os.getenv("SUPABASE_URL")
 SB_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-sb: Client | None = create_client(SB_URL, SB_KEY) if (SB_URL and SB_KEY) else None
+APP_ORIGIN = os.getenv("APP_ORIGIN", "http://localhost:5173")
+BOT_USERNAME = os.getenv("BOT_USERNAME", "")
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+SSE_BUFFER_SIZE = int(os.getenv("SSE_BUFFER_SIZE", "64"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+SEARCH_MAX_FOUNDERS = int(os.getenv("SEARCH_MAX_FOUNDERS", "256"))
+SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", "30"))
+SEARCH_REBUILD_SECONDS = float(os.getenv("SEARCH_REBUILD_SECONDS", "600"))
+SEARCH_PAGE_SIZE = 1000
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "none")          # none | local | shared
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "/dev/shm/verity-cache")
+CACHE_SLOTS = int(os.getenv("CACHE_SLOTS", "4096"))
+CACHE_SLOT_BYTES = int(os.getenv("CACHE_SLOT_BYTES", "16384"))
+CACHE_LOCAL_ENTRIES = int(os.getenv("CACHE_LOCAL_ENTRIES", "4096"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+IDEMPOTENCY_SLOT_BYTES = 1024
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))   # retry of an in-flight submit
+IDEMPOTENCY_PENDING_SECONDS = 60                                                # in-flight marker outlives a crash this long
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", "40"))             # = anyio threadpool size
+ADMISSION_WRITE_CAPACITY = int(os.getenv("ADMISSION_WRITE_CAPACITY", "24"))
+ADMISSION_QUEUE = int(os.getenv("ADMISSION_QUEUE", "200"))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "2"))
+ADMISSION_RESPONSES_RPS = float(os.getenv("ADMISSION_RESPONSES_RPS", "50"))
+ADMISSION_SESSION_RPS = float(os.getenv("ADMISSION_SESSION_RPS", "5"))
+ADMISSION_SESSION_BURST = float(os.getenv("ADMISSION_SESSION_BURST", "20"))
+
+# Supabase client is created on first use (or by the startup warmup), not at import.
+sb: "Client | None" = None
+_sb_lock = threading.Lock()
+
+# -----------------------------------------------------------------------------
+# Readiness: components register here and flip to "ok" once warm
+# -----------------------------------------------------------------------------
+_READY: Dict[str, str] = {}
+
+def _mark(component: str, state: str):
+    _READY[component] = state
+
+def _warm_supabase():
+    if not (SB_URL and SB_KEY):
+        _mark("supabase", "disabled")
+        return
+    _ensure_sb()
+    # cheap round-trip so DNS/TLS/HTTP pool are open before the first real request
+    sb.table("sessions").select("id").limit(1).execute()
+    _mark("supabase", "ok")
+
+def _warm_hashing():
+    _keccak_hex(b"")
+    _mark("hashing", "ok")
+
+def _warm_cache():
+    _cache.open()
+    _idempotency.open()
+    _mark("cache", "ok")
+
+_WARMERS = {"supabase": _warm_supabase, "hashing": _warm_hashing, "cache": _warm_cache}
+
+async def _warmup():
+    pending = dict(_WARMERS)
+    while pending:
+        for name, fn in list(pending.items()):
+            try:
+                await asyncio.to_thread(fn)
+                pending.pop(name)
+            except Exception as e:
+                _mark(name, f"error: {e}")
+        if pending:
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    for name in _WARMERS: _mark(name, "pending")
+    task = asyncio.create_task(_warmup())
+    yield
+    task.cancel()
+
+# -----------------------------------------------------------------------------
+# App & CORS
+# -----------------------------------------------------------------------------
+app = FastAPI(title="Verity Backend", version="0.3.0", lifespan=_lifespan)
+
+# added first so it sits inside CORS: shed responses still carry CORS headers
+_admission = AdmissionController(
+    ADMISSION_CAPACITY, ADMISSION_WRITE_CAPACITY, ADMISSION_QUEUE, ADMISSION_MAX_WAIT,
+    route_limits={"/responses_sb": (ADMISSION_RESPONSES_RPS, 2 * ADMISSION_RESPONSES_RPS)},
+    session_rate=ADMISSION_SESSION_RPS, session_burst=ADMISSION_SESSION_BURST,
+    exempt=("/health", "/ready", "/metrics"),
+)
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, controller=_admission)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,8 +130,33 @@ app.add_middleware(
     allow_credentials=True,
 )
 
-APP_ORIGIN = os.getenv("APP_ORIGIN", "http://localhost:5173")
-BOT_USERNAME = os.getenv("BOT_USERNAME", "")
+class _GZipExceptStreams:
+    """gzip when the client sends Accept-Encoding: gzip, but never buffer SSE streams."""
+    def __init__(self, app, minimum_size: int):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            return await self.app(scope, receive, send)
+        return await self.gzip(scope, receive, send)
+
+app.add_middleware(_GZipExceptStreams, minimum_size=GZIP_MIN_BYTES)
+
+# founder dashboard live feed (see /founder_sessions/stream)
+_feed = ResponseFeed(buffer_size=SSE_BUFFER_SIZE)
+
+# hot lookups (session questions, tester ids, per-founder aggregates); shared across workers
+# when CACHE_BACKEND=shared
+_cache = make_cache(CACHE_BACKEND, SHARED_CACHE_PATH, CACHE_SLOTS, CACHE_SLOT_BYTES, CACHE_LOCAL_ENTRIES)
+
+# replayed /responses_sb submissions; own store (never evicted by hot lookups), cross-worker only
+# when CACHE_BACKEND=shared. Keying on the tester alone needs that: with per-worker entries an
+# A -> B -> A edit across workers would look like a replay of A and be dropped.
+_IDEMPOTENCY_SHARED = CACHE_BACKEND == "shared"
+_idempotency = make_cache("shared" if _IDEMPOTENCY_SHARED else "local", f"{SHARED_CACHE_PATH}-idem",
+                          IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_SLOT_BYTES, IDEMPOTENCY_MAX_ENTRIES)
+_idempotency_stats = {"writes_avoided": 0, "key_conflicts": 0, "in_flight_waits": 0}
 
 # -----------------------------------------------------------------------------
 # File storage layout (legacy/file mode)
@@ -38,20 +164,60 @@ BOT_USERNAME = os.getenv("BOT_USERNAME", "")
 ROOT_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 SESSIONS_DIR = os.path.join(ROOT_DIR, "sessions")
 RESPONSES_DIR = os.path.join(ROOT_DIR, "responses")
-os.makedirs(SESSIONS_DIR, exist_ok=True)
-os.makedirs(RESPONSES_DIR, exist_ok=True)
+
+def _ensure_dirs():
+    # created on first file-mode write instead of at import
+    os.makedirs(SESSIONS_DIR, exist_ok=True)
+    os.makedirs(RESPONSES_DIR, exist_ok=True)
 
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
 def _ensure_sb():
-    if sb is None:
+    global sb
+    if sb is not None:
+        return
+    if not (SB_URL and SB_KEY):
         raise HTTPException(status_code=500, detail="Supabase not configured")
+    with _sb_lock:
+        if sb is None:
+            from supabase import create_client
+            sb = create_client(SB_URL, SB_KEY)
+
+def _keccak_hex(data: bytes) -> str:
+    from Crypto.Hash import keccak
+    k = keccak.new(digest_bits=256); k.update(data)
+    return k.hexdigest()
 
 def _canon_email(s: str | None) -> str:
     if not s: return ""
     return str(s).strip().lower()
 
+def _cached(key: str, load, ttl: float = CACHE_TTL_SECONDS):
+    """Read-through cache; the version check drops the value if the key was invalidated mid-load."""
+    value, version = _cache.get(key)
+    if value is None:
+        value = load()
+        if value is not None:
+            _cache.set(key, value, ttl=ttl, expected_version=version)
+    return value
+
+def _parse_fields(fields: str | None, allowed: tuple) -> List[str]:
+    """`fields=a,b` projection; None/empty means every field (the old payload)."""
+    if not fields or not fields.strip():
+        return list(allowed)
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(wanted - set(allowed))
+    if unknown:
+        raise HTTPException(400, f"unknown fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})")
+    return [f for f in allowed if f in wanted]
+
+def _answers_preview(answers: dict | None) -> str:
+    parts = []
+    for k, v in list((answers or {}).items())[:3]:
+        s = str(v); parts.append(f"{k}={s[:40]}{'…' if len(s) > 40 else ''}")
+    return ", ".join(parts)
+
 # -----------------------------------------------------------------------------
 # Models — Streamlit-parity (Supabase flow)
 # -----------------------------------------------------------------------------
@@ -120,6 +286,18 @@ class ResponsePayload(BaseModel):
 def health():
     return {"status": "ok", "service": "verity-backend", "time": datetime.utcnow().isoformat()}
 
+@app.get("/ready")
+def ready():
+    # every warmer must have reported; an empty _READY means the lifespan never ran
+    ok = all(_READY.get(name) in ("ok", "disabled") for name in _WARMERS)
+    body = {"ready": ok, "components": dict(_READY), "time": datetime.utcnow().isoformat()}
+    return JSONResponse(body, status_code=200 if ok else 503)
+
+@app.get("/metrics")
+def metrics():
+    return {"cache": _cache.info(), "feed": _feed.stats(), "search": _search.stats(),
+            "admission": _admission.stats(), "idempotency": {**_idempotency_stats, "store": _idempotency.info()}}
+
 @app.get("/")
 def root():
     return {"message": "Verity Backend is running. See /docs for API spec."}
@@ -154,6 +332,7 @@ def founder_register(req: FounderRegister):
 # -----------------------------------------------------------------------------
 @app.post("/session", response_model=SessionCreateResp)
 def create_session_file(payload: SessionCreate):
+    _ensure_dirs()
     sid = str(uuid.uuid4())
     stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
     path = os.path.join(SESSIONS_DIR, f"{stamp}_{sid}.json")
@@ -169,6 +348,7 @@ def create_session_file(payload: SessionCreate):
 def store_response_file(payload: ResponsePayload):
     if not isinstance(payload.answers, dict) or not payload.answers:
         raise HTTPException(400, "answers must be a non-empty object")
+    _ensure_dirs()
     serialized = json.dumps(payload.model_dump(), sort_keys=True).encode("utf-8")
     digest = hashlib.sha256(serialized).hexdigest()
     stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
@@ -267,8 +447,7 @@ def hash_text(payload: HashRequest):
     txt = payload.text.strip()
     if not txt: raise HTTPException(400, "text cannot be empty")
     sha = hashlib.sha256(txt.encode("utf-8")).hexdigest()
-    k = keccak.new(digest_bits=256); k.update(txt.encode("utf-8"))
-    return HashResponse(sha256=sha, keccak=k.hexdigest())
+    return HashResponse(sha256=sha, keccak=_keccak_hex(txt.encode("utf-8")))
 
 # -----------------------------------------------------------------------------
 # File-mode summary (legacy)
@@ -299,6 +478,18 @@ def get_summary_filemode(session_id: str):
 # -----------------------------------------------------------------------------
 # Supabase helpers
 # -----------------------------------------------------------------------------
+def _session_questions(session_id: str) -> dict | None:
+    # questions never change after creation, so this is safe to share across workers
+    return _cached(f"session:{session_id}", lambda: (
+        sb.table("sessions").select("questions").eq("id", session_id).single().execute().data
+    ))
+
+def _session_founder(session_id: str) -> dict | None:
+    # write path: only the owner, not the (large) questions array
+    return _cached(f"session_founder:{session_id}", lambda: (
+        sb.table("sessions").select("founder_email").eq("id", session_id).single().execute().data
+    ))
+
 def _ensure_founder(email: str, display_name: str | None = None):
     _ensure_sb()
     email = _canon_email(email)
@@ -486,6 +677,7 @@ def create_session_sb(payload: FounderInputsStreamlit):
         "status": "active",
     }).execute()
     sid = ins.data[0]["id"]
+    _cache.invalidate(f"founder_sessions:{founder_email}")
 
     share_link = (f"https://t.me/{BOT_USERNAME}?startapp=sid_{sid}"
                   if BOT_USERNAME else f"{APP_ORIGIN}/respond?sid={sid}")
@@ -498,7 +690,7 @@ def create_session_sb(payload: FounderInputsStreamlit):
 def session_questions(session_id: str):
     _ensure_sb()
     if not session_id: raise HTTPException(400, "session_id is required")
-    row = sb.table("sessions").select("questions").eq("id", session_id).single().execute().data
+    row = _session_questions(session_id)
     if not row: raise HTTPException(404, "session not found")
     return {"session_id": session_id, "steps": row["questions"]}
 
@@ -508,7 +700,7 @@ def session_questions_with_answers(session_id: str, tester_email: str | None = N
     if not session_id: raise HTTPException(400, "session_id is required")
     
     # Get session questions
-    row = sb.table("sessions").select("questions").eq("id", session_id).single().execute().data
+    row = _session_questions(session_id)
     if not row: raise HTTPException(404, "session not found")
     
     # Get user's previous answers if email provided
@@ -543,13 +735,81 @@ class SubmitAnswersReq(BaseModel):
     tester_handle: Optional[str] = None
     answers: dict
 
+def _idempotency_key(req: SubmitAnswersReq, header: str | None) -> str | None:
+    """Client key if sent, else (session, tester) when the store is shared. The stored entry holds
+    the last answer hash for that tester, so only a repeat of the latest submission is short-circuited."""
+    if header and header.strip():
+        return f"idem:hdr:{req.session_id}:{header.strip()}"
+    if not _IDEMPOTENCY_SHARED:
+        return None
+    if req.tester_email and "@" in req.tester_email:
+        return f"idem:tester:{req.session_id}:{_canon_email(req.tester_email)}"
+    if req.tester_handle:
+        return f"idem:handle:{req.session_id}:{req.tester_handle}"
+    return None   # anonymous without a key: identical answers may be different people
+
+def _await_in_flight(idem_key: str, sha: str) -> dict | None:
+    """Wait for the request that set the in-flight marker; its entry, or None if it failed."""
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        prior = _idempotency.get(idem_key)[0]
+        if not prior or prior["sha256"] != sha or not prior.get("pending"):
+            return prior
+        if time.monotonic() > deadline:
+            raise HTTPException(409, "this submission is still being processed, retry later",
+                                headers={"Retry-After": "2"})
+        time.sleep(0.05)
+
 @app.post("/responses_sb")
-def submit_responses_sb(req: SubmitAnswersReq):
+def submit_responses_sb(req: SubmitAnswersReq,
+                        idempotency_key: str | None = Header(None, alias="Idempotency-Key")):
     _ensure_sb()
     if not isinstance(req.answers, dict) or not req.answers:
         raise HTTPException(400, "answers must be a non-empty object")
 
-    sess = sb.table("sessions").select("id, founder_email").eq("id", req.session_id).single().execute().data
+    payload_str = json.dumps(req.answers, sort_keys=True, ensure_ascii=False)
+    sha = hashlib.sha256(payload_str.encode()).hexdigest()
+
+    # Exact replays (webview retries) return the original result before any DB call; a retry
+    # that arrives while the original is still running waits for it instead of writing again
+    idem_key = _idempotency_key(req, idempotency_key)
+    if idem_key:
+        prior = _idempotency.get(idem_key)[0]
+        same = lambda p: p["sha256"] == sha and (idempotency_key or p.get("handle") == req.tester_handle)
+        if prior and prior.get("pending") and same(prior):
+            _idempotency_stats["in_flight_waits"] += 1
+            prior = _await_in_flight(idem_key, sha)
+        if prior and not prior.get("pending") and same(prior):
+            _idempotency_stats["writes_avoided"] += 1
+            return prior["result"]
+        if prior and idempotency_key:
+            _idempotency_stats["key_conflicts"] += 1
+            raise HTTPException(422, "Idempotency-Key was already used with different answers")
+
+    if ADMISSION_ENABLED:
+        try:
+            _admission.check_session("/responses_sb", req.session_id)
+        except Shed as e:
+            detail = ("too many submissions for this session" if e.reason == "session_rate"
+                      else "too many submissions") + ", retry later"
+            raise HTTPException(e.status, detail,
+                                headers={"Retry-After": str(e.retry_after)})
+
+    if not idem_key:
+        return _store_response(req, payload_str, sha)
+    _idempotency.set(idem_key, {"sha256": sha, "handle": req.tester_handle, "pending": True},
+                     ttl=IDEMPOTENCY_PENDING_SECONDS)
+    try:
+        result = _store_response(req, payload_str, sha)
+    except BaseException:
+        _idempotency.invalidate(idem_key)   # let the retry do the write
+        raise
+    _idempotency.set(idem_key, {"sha256": sha, "handle": req.tester_handle, "result": result},
+                     ttl=IDEMPOTENCY_TTL_SECONDS)
+    return result
+
+def _store_response(req: SubmitAnswersReq, payload_str: str, sha: str) -> dict:
+    sess = _session_founder(req.session_id)
     if not sess: raise HTTPException(404, "Session not found")
 
     # Prevent founders from submitting responses to their own questionnaires
@@ -559,15 +819,20 @@ def submit_responses_sb(req: SubmitAnswersReq):
     # tester upsert
     if req.tester_email and "@" in req.tester_email:
         email = _canon_email(req.tester_email)
-        # upsert by email (requires testers.email UNIQUE)
-        sb.table("testers").upsert(
-            {"email": email, "telegram_handle": req.tester_handle},
-            on_conflict="email",
-        ).execute()
-        tester_row = (
-            sb.table("testers").select("id").eq("email", email).single().execute().data
-        )
-        tester_id = tester_row["id"]
+        known = _cache.get(f"tester:{email}")[0]
+        if known and known.get("handle") == req.tester_handle:
+            tester_id = known["id"]   # row already up to date, skip upsert + select
+        else:
+            # upsert by email (requires testers.email UNIQUE)
+            sb.table("testers").upsert(
+                {"email": email, "telegram_handle": req.tester_handle},
+                on_conflict="email",
+            ).execute()
+            tester_row = (
+                sb.table("testers").select("id").eq("email", email).single().execute().data
+            )
+            tester_id = tester_row["id"]
+            _cache.set(f"tester:{email}", {"id": tester_id, "handle": req.tester_handle}, ttl=CACHE_TTL_SECONDS)
     else:
         # make a unique anon email
         anon = f"anon_{int(datetime.utcnow().timestamp())}@tg.local"
@@ -576,25 +841,48 @@ def submit_responses_sb(req: SubmitAnswersReq):
         ).execute()
         tester_id = t.data[0]["id"]
 
-    payload_str = json.dumps(req.answers, sort_keys=True, ensure_ascii=False)
-    sha = hashlib.sha256(payload_str.encode()).hexdigest()
     try:
-        k = keccak.new(digest_bits=256); k.update(payload_str.encode()); keccak_hex = k.hexdigest()
+        keccak_hex = _keccak_hex(payload_str.encode())
     except Exception:
         keccak_hex = sha
 
+    # Only pay for the existence check when a dashboard is listening for this founder
+    founder_key = _canon_email(sess["founder_email"])
+    watched = _feed.has_subscribers(founder_key)
+    existed = False
+    if watched and req.tester_email and "@" in req.tester_email:
+        existed = bool(
+            sb.table("responses").select("id").eq("session_id", req.session_id)
+            .eq("tester_id", tester_id).limit(1).execute().data
+        )
+
     # Use upsert to handle duplicate submissions gracefully
-    sb.table("responses").upsert({
+    up = sb.table("responses").upsert({
         "session_id": req.session_id,
         "tester_id": tester_id,         # when available
         "tester_email": req.tester_email,   # optional fallback
         "founder_email": sess["founder_email"],
         "answers": req.answers,
         "answer_hash": keccak_hex,
+        "preview": _answers_preview(req.answers),
         "payment_amount": 0,
         "paid": False
     }, on_conflict="session_id,tester_id").execute()
 
+    _cache.invalidate(f"summary:{req.session_id}")
+    _cache.invalidate(f"founder_sessions:{founder_key}")
+
+    row = (up.data or [{}])[0]
+    if row.get("id"):
+        _search.on_response(founder_key, row["id"], req.session_id, row.get("created_at"), req.answers)
+    if watched:
+        _feed.publish(founder_key, {
+            "type": "response",
+            "session_id": req.session_id,
+            "responses_delta": 0 if existed else 1,
+            "last_response_at": None if existed else (row.get("created_at") or datetime.utcnow().isoformat()),
+        })
+
     return {"ok": True, "hashes": {"sha256": sha, "keccak": keccak_hex}}
 
 # -----------------------------------------------------------------------------
@@ -603,6 +891,9 @@ def submit_responses_sb(req: SubmitAnswersReq):
 @app.get("/summary_sb")
 def summary_sb(session_id: str):
     _ensure_sb()
+    return _cached(f"summary:{session_id}", lambda: _summary_sb(session_id))
+
+def _summary_sb(session_id: str) -> dict:
     rows = (sb.table("responses").select("created_at").eq("session_id", session_id).order("created_at", desc=False).execute().data) or []
     count = len(rows)
     first_ts = rows[0]["created_at"] if count else None
@@ -613,6 +904,9 @@ def summary_sb(session_id: str):
 def founder_sessions(founder_email: str):
     _ensure_sb()
     founder_email = _canon_email(founder_email)
+    return _cached(f"founder_sessions:{founder_email}", lambda: _founder_sessions(founder_email))
+
+def _founder_sessions(founder_email: str) -> dict:
     sess: List[Dict[str, Any]] = (
         sb.table("sessions").select("id, created_at, status").eq("founder_email", founder_email)
         .order("created_at", desc=True).execute().data or []
@@ -637,10 +931,50 @@ def founder_sessions(founder_email: str):
 
     return {"sessions": sess}
 
+# -----------------------------------------------------------------------------
+# Live feed for the founder dashboard (SSE)
+# -----------------------------------------------------------------------------
+def _sse(event: dict) -> str:
+    return f"id: {event.get('seq', '')}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@app.get("/founder_sessions/stream")
+async def founder_sessions_stream(request: Request, founder_email: str, session_id: str | None = None):
+    """Incremental updates for /founder_sessions: apply `response` deltas (responses_delta,
+    last_response_at) to the snapshot. On `resync` - always the first event of a connection,
+    including reconnects, whose missed events are not replayed - refetch the snapshot."""
+    founder_email = _canon_email(founder_email)
+    if not founder_email: raise HTTPException(400, "founder_email is required")
+
+    async def events():
+        # subscribe here, not in the handler: if the client is gone before the body starts,
+        # the generator never runs and nothing is left registered
+        sub = _feed.subscribe(founder_email, session_id)
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    ev = await asyncio.wait_for(sub.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield _sse(ev)
+        finally:
+            _feed.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+_SESSION_RESPONSE_FIELDS = ("id", "created_at", "answer_hash", "tester_email", "tester_handle", "preview", "answers")
+
 @app.get("/session_responses")
-def session_responses(session_id: str, include_answers: bool = False, tester_email: str | None = None):
+def session_responses(session_id: str, include_answers: bool = False, tester_email: str | None = None,
+                      fields: str | None = None):
     _ensure_sb()
     if not session_id: raise HTTPException(400, "session_id is required")
+    wanted = _parse_fields(fields, _SESSION_RESPONSE_FIELDS)
+    # the default payload carries answers only with include_answers; an explicit fields= list decides alone
+    want_answers = "answers" in wanted and (include_answers or bool(fields and fields.strip()))
+    want_tester = "tester_email" in wanted or "tester_handle" in wanted
 
     tester_id_filter = None
     if tester_email:
@@ -648,15 +982,18 @@ def session_responses(session_id: str, include_answers: bool = False, tester_ema
         if not t: return {"session_id": session_id, "responses": []}
         tester_id_filter = t["id"]
 
-    cols = "id, tester_id, answer_hash, created_at, answers"
-    resp_q = sb.table("responses").select(cols).eq("session_id", session_id)
+    # preview is computed at write time, so list views never need the answers blob
+    cols = ["id", "created_at", "answer_hash", "preview"]
+    if want_tester: cols.append("tester_id")
+    if want_answers: cols.append("answers")
+    resp_q = sb.table("responses").select(", ".join(cols)).eq("session_id", session_id)
     if tester_id_filter: resp_q = resp_q.eq("tester_id", tester_id_filter)
 
     resp_rows = resp_q.order("created_at", desc=True).execute().data or []
     if not resp_rows: return {"session_id": session_id, "responses": []}
 
-    tester_ids = sorted({r["tester_id"] for r in resp_rows if r.get("tester_id")})
     tmap: Dict[str, Dict[str, str | None]] = {}
+    tester_ids = sorted({r["tester_id"] for r in resp_rows if r.get("tester_id")}) if want_tester else []
     if tester_ids:
         trows = sb.table("testers").select("id, email, telegram_handle").in_("id", tester_ids).execute().data or []
         tmap = {t["id"]: {"email": t["email"], "handle": t.get("telegram_handle")} for t in trows}
@@ -664,21 +1001,60 @@ def session_responses(session_id: str, include_answers: bool = False, tester_ema
     out: List[Dict] = []
     for r in resp_rows:
         ans = r.get("answers") or {}
-        preview_parts = []
-        for k, v in list(ans.items())[:3]:
-            s = str(v); preview_parts.append(f"{k}={s[:40]}{'…' if len(s) > 40 else ''}")
         ti = tmap.get(r.get("tester_id"), {})
-        out.append({
+        item = {
             "id": r["id"],
             "created_at": r["created_at"],
             "answer_hash": r["answer_hash"],
             "tester_email": ti.get("email"),
             "tester_handle": ti.get("handle"),
-            "preview": ", ".join(preview_parts),
-            "answers": (ans if include_answers else None),
-        })
+            "preview": r.get("preview") or _answers_preview(ans),
+            "answers": (ans if want_answers else None),
+        }
+        out.append({k: item[k] for k in wanted})
     return {"session_id": session_id, "responses": out}
 
+# -----------------------------------------------------------------------------
+# Full-text search over free-text answers (per-founder inverted index)
+# -----------------------------------------------------------------------------
+def _load_founder_answers(founder_email: str, since: str | None):
+    _ensure_sb()
+    start = 0
+    while True:
+        q = sb.table("responses").select("id, session_id, created_at, answers").eq("founder_email", founder_email)
+        if since: q = q.gt("created_at", since)
+        rows = q.order("created_at").range(start, start + SEARCH_PAGE_SIZE - 1).execute().data or []
+        yield from rows
+        if len(rows) < SEARCH_PAGE_SIZE: return
+        start += SEARCH_PAGE_SIZE
+
+_search = SearchIndex(_load_founder_answers, max_founders=SEARCH_MAX_FOUNDERS,
+                      refresh_seconds=SEARCH_REFRESH_SECONDS, rebuild_seconds=SEARCH_REBUILD_SECONDS)
+
+@app.get("/search_responses")
+def search_responses(founder_email: str, q: str, session_id: str | None = None, limit: int = 20, offset: int = 0):
+    """BM25-ranked answers from context, pb_N_reason, pb_N_attempts, price_fair and anything_else.
+    highlights are [start, end) character offsets into snippet."""
+    _ensure_sb()
+    founder_email = _canon_email(founder_email)
+    if not founder_email: raise HTTPException(400, "founder_email is required")
+    if not q or not q.strip(): raise HTTPException(400, "q is required")
+    limit = max(1, min(limit, 100)); offset = max(0, offset)
+    res = _search.search(founder_email, q, session_id=session_id, limit=limit, offset=offset)
+    return {"q": q, "session_id": session_id, "total": res["total"], "limit": limit, "offset": offset,
+            "items": res["items"]}
+
+# -----------------------------------------------------------------------------
+# Answer themes (computed offline by `python -m app.themes`)
+# -----------------------------------------------------------------------------
+@app.get("/session_themes")
+def session_themes(session_id: str):
+    if not session_id: raise HTTPException(400, "session_id is required")
+    if not themes.SESSION_ID_RE.match(session_id): raise HTTPException(400, "invalid session_id")
+    cached = themes.load_cached(session_id)
+    if not cached: raise HTTPException(404, "themes not computed for this session yet")
+    return cached
+
 @app.get("/tester_questionnaires")
 def tester_questionnaires(uid: str | None = None, tester_email: str | None = None):
     _ensure_sb()
@@ -826,46 +1202,63 @@ def tester_questionnaires(uid: str | None = None, tester_email: str | None = Non
     
     return {"questionnaires": questionnaires}
 
+_TESTER_RESPONSE_FIELDS = ("id", "session_id", "created_at", "answer_hash", "answers", "founder_email",
+                           "company_name", "problem_domain", "session_status", "payment_amount", "paid")
+# output field -> founder_inputs columns it needs
+_TESTER_RESPONSE_FI_COLS = {"company_name": ("founder_display_name", "founder_email"),
+                            "problem_domain": ("problem_domain",)}
+
+def _tester_responses_select(wanted: List[str]) -> str:
+    resp_cols = ["id"] + [f for f in ("session_id", "created_at", "answer_hash", "answers", "founder_email",
+                                      "payment_amount", "paid") if f in wanted]
+    fi_cols = sorted({c for f in wanted for c in _TESTER_RESPONSE_FI_COLS.get(f, ())}) or ["id"]
+    sess_cols = (["status"] if "session_status" in wanted else []) + [f"founder_inputs!inner({', '.join(fi_cols)})"]
+    # keep the !inner joins so the row set matches the unprojected query
+    return ", ".join(resp_cols + [f"sessions!inner({', '.join(sess_cols)})"])
+
 @app.get("/tester_responses")
-def tester_responses(uid: str | None = None, tester_email: str | None = None):
+def tester_responses(uid: str | None = None, tester_email: str | None = None, fields: str | None = None):
     _ensure_sb()
-    
+    wanted = _parse_fields(fields, _TESTER_RESPONSE_FIELDS)
+    select = _tester_responses_select(wanted)
+
     # Get responses with session and founder details
     if uid:  # supabase auth uid
         # Join responses with sessions and founder_inputs to get company details
         rows = (sb.table("responses")
-                .select("*, sessions!inner(*, founder_inputs!inner(*))")
+                .select(select)
                 .eq("tester_id", uid)
                 .order("created_at", desc=True)
                 .execute().data)
     elif tester_email:
         # fallback by email
         rows = (sb.table("responses")
-                .select("*, sessions!inner(*, founder_inputs!inner(*))")
+                .select(select)
                 .eq("tester_email", tester_email.lower())
                 .order("created_at", desc=True)
                 .execute().data)
     else:
         rows = []
-    
+
     # Format the response data
     formatted_responses = []
     for row in rows:
         session_data = row.get("sessions", {})
         founder_data = session_data.get("founder_inputs", {})
-        
-        formatted_responses.append({
+
+        item = {
             "id": row["id"],
-            "session_id": row["session_id"],
-            "created_at": row["created_at"],
-            "answer_hash": row["answer_hash"],
-            "answers": row["answers"],
-            "founder_email": row["founder_email"],
+            "session_id": row.get("session_id"),
+            "created_at": row.get("created_at"),
+            "answer_hash": row.get("answer_hash"),
+            "answers": row.get("answers"),
+            "founder_email": row.get("founder_email"),
             "company_name": founder_data.get("founder_display_name") or founder_data.get("founder_email") or "Unknown Company",
             "problem_domain": founder_data.get("problem_domain") or "General",
             "session_status": session_data.get("status", "unknown"),
             "payment_amount": row.get("payment_amount", 0),
             "paid": row.get("paid", False)
-        })
-    
+        }
+        formatted_responses.append({k: item[k] for k in wanted})
+
     return {"responses": formatted_responses}
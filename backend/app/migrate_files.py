@@ -0,0 +1,321 @@
+"""Bulk-migrate legacy file-mode data (data/sessions, data/responses) into Supabase.
+
+    cd backend
+    python -m app.migrate_files                       # sessions, then responses
+    python -m app.migrate_files --workers 16 --batch-size 500
+    python -m app.migrate_files --dry-run             # parse + map only, no writes
+
+Files are streamed in sorted order and upserted in batches from a thread pool,
+so re-running is safe. Progress is checkpointed (--checkpoint) as the last file
+of the longest fully-written prefix; an interrupted run resumes after it. Files
+are sorted by (session, tester), not by time, so a file the still-live file-mode
+endpoints write during or after a run can sort before the mark: on resume, files
+before the mark that were modified since the first run started are migrated again.
+
+Mapping:
+  * every legacy session gets its own founder `file_<session_id>@file.local`
+    (founder_inputs is unique per founder_email); FounderInputs.idea_summary ->
+    problem_domain, target_user -> target_audience; the session keeps its id,
+    created_at and is stored with status "archived" and the deterministic questions.
+  * respondents become testers (their email if respondent_id is one, otherwise
+    `file_<respondent_id>@file.local`); hash_sha256 and received_at_utc are kept
+    as responses.hash_sha256 / created_at. Needs sql/2026-10-19_responses_hash_sha256.sql.
+"""
+import argparse, json, os, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import main as backend
+
+LEGACY_DOMAIN = "file.local"
+DEFAULT_CHECKPOINT = os.path.join(backend.ROOT_DIR, ".migrate_checkpoint.json")
+RETRIES = 3
+MTIME_SLACK = 2.0           # seconds; coarse filesystem timestamps
+
+_local = threading.local()
+
+
+def _client():
+    if getattr(_local, "sb", None) is None:
+        from supabase import create_client
+        _local.sb = create_client(backend.SB_URL, backend.SB_KEY)
+    return _local.sb
+
+
+def _utc(ts: Optional[str]) -> Optional[str]:
+    # file mode wrote naive datetime.utcnow().isoformat()
+    if not ts: return None
+    return ts if ts.endswith("Z") or "+" in ts[10:] else ts + "+00:00"
+
+
+def legacy_founder_email(session_id: str) -> str:
+    return f"file_{session_id}@{LEGACY_DOMAIN}"
+
+
+def legacy_tester_email(respondent_id: str) -> str:
+    rid = (respondent_id or "").strip()
+    return backend._canon_email(rid) if "@" in rid else f"file_{rid or 'anon'}@{LEGACY_DOMAIN}"
+
+
+# -----------------------------------------------------------------------------
+# File listing (sorted, so batches and the checkpoint are deterministic)
+# -----------------------------------------------------------------------------
+def _session_key(name: str) -> Tuple:
+    return (name,)
+
+
+def _response_key(name: str) -> Tuple:
+    # {stamp}_{session_id}_{respondent_id}_{hash12}.json; group by (session, tester) on the same
+    # canonical tester email the rows are keyed on, so A@x.com and a@x.com share a batch
+    parts = name[:-len(".json")].split("_")
+    if len(parts) < 4:
+        return ("", name, "", name)
+    return (parts[1], legacy_tester_email("_".join(parts[2:-1])), parts[0], name)
+
+
+def _list(dirpath: str, key: Callable[[str], Tuple]) -> List[str]:
+    if not os.path.isdir(dirpath):
+        return []
+    with os.scandir(dirpath) as it:
+        names = [e.name for e in it if e.is_file() and e.name.endswith(".json")]
+    return sorted(names, key=key)
+
+
+def _batches(names: List[str], size: int, group: Callable[[str], Tuple]) -> Iterator[List[str]]:
+    """Fixed-size batches, but never split a group (same session+respondent) across two."""
+    batch: List[str] = []
+    for name in names:
+        if len(batch) >= size and group(name) != group(batch[-1]):
+            yield batch
+            batch = []
+        batch.append(name)
+    if batch:
+        yield batch
+
+
+def _read(dirpath: str, name: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(dirpath, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# -----------------------------------------------------------------------------
+# Mapping + writes
+# -----------------------------------------------------------------------------
+def founder_inputs_row(session_id: str, fi: dict) -> dict:
+    return {
+        "founder_email": legacy_founder_email(session_id),
+        "founder_display_name": None,
+        "problem_domain": fi.get("idea_summary"),
+        "target_audience": fi.get("target_user"),
+        "problems": json.dumps(fi.get("problems") or []),
+        "value_prop": fi.get("value_prop"),
+        "target_action": fi.get("target_action"),
+    }
+
+
+def session_ids(dirpath: str, names: List[str]) -> set:
+    """Ids of the sessions migrate_sessions_batch writes for these files (unreadable ones are skipped)."""
+    return {d["session_id"] for d in (_read(dirpath, n) for n in names) if d and d.get("session_id")}
+
+
+def migrate_sessions_batch(dirpath: str, names: List[str], dry_run: bool, written: Optional[set] = None) -> dict:
+    docs = [d for d in (_read(dirpath, n) for n in names) if d and d.get("session_id")]
+    stats = {"files": len(names), "written": len(docs), "skipped": len(names) - len(docs)}
+    if written is not None:
+        written.update(d["session_id"] for d in docs)
+    if dry_run or not docs:
+        return stats
+    sb = _client()
+    fi_rows = [founder_inputs_row(d["session_id"], d.get("founder_inputs") or {}) for d in docs]
+    sb.table("founders").upsert([{"email": r["founder_email"], "display_name": None} for r in fi_rows],
+                                on_conflict="email").execute()
+    saved = sb.table("founder_inputs").upsert(fi_rows, on_conflict="founder_email").execute().data or []
+    fi_by_email = {r["founder_email"]: r for r in saved}
+    sessions = []
+    for d, fi in zip(docs, fi_rows):
+        fi_saved = fi_by_email[fi["founder_email"]]
+        sessions.append({
+            "id": d["session_id"],
+            "founder_email": fi["founder_email"],
+            "founder_inputs_id": fi_saved["id"],
+            "questions": backend._deterministic_steps(fi_saved),
+            "status": "archived",
+            "created_at": _utc(d.get("created_at_utc")),
+        })
+    sb.table("sessions").upsert(sessions, on_conflict="id").execute()
+    return stats
+
+
+def migrate_responses_batch(dirpath: str, names: List[str], dry_run: bool, known_sessions: set) -> dict:
+    latest: Dict[Tuple[str, str], dict] = {}
+    skipped = orphaned = 0
+    for name in names:  # sorted by (session, respondent, stamp): last one wins, like the upsert
+        d = _read(dirpath, name)
+        p = (d or {}).get("payload") or {}
+        if not p.get("session_id") or not isinstance(p.get("answers"), dict):
+            skipped += 1; continue
+        if p["session_id"] not in known_sessions:
+            orphaned += 1; continue
+        latest[(p["session_id"], legacy_tester_email(p.get("respondent_id")))] = d
+    stats = {"files": len(names), "written": len(latest), "skipped": skipped, "orphaned": orphaned,
+             "superseded": len(names) - skipped - orphaned - len(latest)}
+    if dry_run or not latest:
+        return stats
+    sb = _client()
+    emails = sorted({email for _, email in latest})
+    testers = sb.table("testers").upsert([{"email": e} for e in emails], on_conflict="email").execute().data or []
+    tester_ids = {t["email"]: t["id"] for t in testers}
+    rows = []
+    for (sid, email), d in latest.items():
+        p = d["payload"]
+        answers = p["answers"]
+        payload_str = json.dumps(answers, sort_keys=True, ensure_ascii=False)
+        rows.append({
+            "session_id": sid,
+            "tester_id": tester_ids[email],
+            "tester_email": None if email.endswith("@" + LEGACY_DOMAIN) else email,
+            "founder_email": legacy_founder_email(sid),
+            "answers": answers,
+            "answer_hash": backend._keccak_hex(payload_str.encode()),
+            "hash_sha256": d.get("hash_sha256"),
+            "preview": backend._answers_preview(answers),
+            "created_at": _utc(d.get("received_at_utc")),
+            "payment_amount": 0,
+            "paid": False,
+        })
+    sb.table("responses").upsert(rows, on_conflict="session_id,tester_id").execute()
+    return stats
+
+
+# -----------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------
+class Checkpoint:
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.data: Dict[str, str] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    def begin(self, phase: str):
+        # time of the first run of this phase; kept across resumes (saved with the first mark)
+        self.data.setdefault(f"{phase}@started", str(time.time()))
+
+    def started(self, phase: str) -> float:
+        # checkpoints without a start time: every file before the mark counts as possibly missed
+        return float(self.data.get(f"{phase}@started", 0))
+
+    def save(self, phase: str, last_name: str):
+        self.data[phase] = last_name
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp, self.path)
+
+
+def run_phase(phase: str, names: List[str], key: Callable[[str], Tuple], work: Callable[[List[str]], dict],
+              ckpt: Checkpoint, workers: int, batch_size: int, log=print, dirpath: Optional[str] = None) -> dict:
+    done_mark = ckpt.data.get(phase)
+    if done_mark:
+        since = ckpt.started(phase) - MTIME_SLACK
+        late = lambda n: dirpath is not None and os.path.getmtime(os.path.join(dirpath, n)) >= since
+        names = [n for n in names if key(n) > key(done_mark) or late(n)]
+    ckpt.begin(phase)
+    group = (lambda n: key(n)[:2]) if phase == "responses" else key
+    totals: Dict[str, int] = {}
+    t0 = last_log = time.monotonic()
+    files_done = 0
+
+    def attempt(batch: List[str]) -> dict:
+        for i in range(RETRIES):
+            try:
+                return work(batch)
+            except Exception:
+                if i == RETRIES - 1:
+                    raise
+                time.sleep(2 ** i)
+
+    batches = _batches(names, batch_size, group)
+    inflight: Dict = {}
+    finished: Dict[int, List[str]] = {}
+    next_to_mark = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        seq = 0
+        exhausted = False
+        while inflight or not exhausted:
+            # keep the pool busy but bounded, so huge directories are streamed, not loaded
+            while not exhausted and len(inflight) < workers * 2:
+                batch = next(batches, None)
+                if batch is None:
+                    exhausted = True; break
+                inflight[pool.submit(attempt, batch)] = (seq, batch); seq += 1
+            if not inflight:
+                break
+            ready, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            failed = None
+            for fut in sorted(ready, key=lambda f: inflight[f][0]):
+                idx, batch = inflight.pop(fut)
+                if fut.exception() is not None:
+                    failed = failed or fut.exception()
+                    continue
+                for k, v in fut.result().items():
+                    totals[k] = totals.get(k, 0) + v
+                files_done += len(batch)
+                finished[idx] = batch
+            # advance the checkpoint over the contiguous prefix of finished batches
+            while next_to_mark in finished:
+                ckpt.save(phase, finished.pop(next_to_mark)[-1]); next_to_mark += 1
+            if failed is not None:
+                raise failed  # a batch that failed all retries stops the run; rerun resumes
+            now = time.monotonic()
+            if now - last_log >= 5:
+                log(f"{phase}: {files_done}/{len(names)} files, {files_done / (now - t0):.0f} files/s")
+                last_log = now
+    elapsed = time.monotonic() - t0
+    totals["seconds"] = round(elapsed, 2)
+    totals["files_per_second"] = round(files_done / elapsed, 1) if elapsed > 0 else 0.0
+    log(f"{phase}: done {json.dumps(totals)}")
+    return totals
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Migrate data/sessions and data/responses into Supabase.")
+    ap.add_argument("--sessions-dir", default=backend.SESSIONS_DIR)
+    ap.add_argument("--responses-dir", default=backend.RESPONSES_DIR)
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--batch-size", type=int, default=500)
+    ap.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="'' to disable")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args(argv)
+
+    if not args.dry_run and not (backend.SB_URL and backend.SB_KEY):
+        print("SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY are not set", file=sys.stderr)
+        return 2
+    ckpt = Checkpoint(None if args.dry_run else (args.checkpoint or None))
+
+    session_names = _list(args.sessions_dir, _session_key)
+    # responses are only migrated for sessions that are in the database: the ones this run writes
+    # plus the ones written before the checkpoint (a session file that cannot be read is neither)
+    mark = ckpt.data.get("sessions")
+    before_mark = [n for n in session_names if mark and _session_key(n) <= _session_key(mark)]
+    known = session_ids(args.sessions_dir, before_mark)
+    summary = {
+        "sessions": run_phase("sessions", session_names, _session_key,
+                              lambda b: migrate_sessions_batch(args.sessions_dir, b, args.dry_run, known),
+                              ckpt, args.workers, args.batch_size, dirpath=args.sessions_dir),
+        "responses": run_phase("responses", _list(args.responses_dir, _response_key), _response_key,
+                               lambda b: migrate_responses_batch(args.responses_dir, b, args.dry_run, known),
+                               ckpt, args.workers, args.batch_size, dirpath=args.responses_dir),
+    }
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
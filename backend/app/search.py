@@ -0,0 +1,273 @@
+"""In-memory inverted index over free-text answers, one index per founder.
+
+Documents are single answers (one response field), scored with BM25. Indexes are
+built on first query from a loader and then kept current by ``on_response`` from
+the write path; ``catch_up`` pulls rows written by other workers since the last
+sync. Periodic rebuilds load a fresh index in a background thread while queries
+keep using the current one, which is swapped out when the load finishes.
+Least-recently-used founders are evicted past ``max_founders``.
+"""
+import heapq, math, re, threading, time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+SEARCHABLE_FIELD = re.compile(r"^(context|price_fair|anything_else|pb_\d+_reason|pb_\d+_attempts)$")
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_CHARS = 160
+
+
+def norm_token(token: str) -> str:
+    # lowercase + naive plural folding so "notification" matches "notifications"
+    t = token.lower()
+    if len(t) > 3 and t.endswith("s") and not t.endswith("ss"):
+        t = t[:-1]
+    return t
+
+
+def tokenize(text: str) -> List[str]:
+    return [norm_token(m.group(0)) for m in WORD_RE.finditer(text)]
+
+
+def searchable_answers(answers: dict) -> Iterable[Tuple[str, str]]:
+    for field, value in (answers or {}).items():
+        if isinstance(value, str) and value.strip() and SEARCHABLE_FIELD.match(field):
+            yield field, value
+
+
+def snippet(text: str, terms: set) -> Tuple[str, List[List[int]]]:
+    """Window around the first match; highlights are [start, end) offsets into the snippet."""
+    hits = [(m.start(), m.end()) for m in WORD_RE.finditer(text) if norm_token(m.group(0)) in terms]
+    if not hits:
+        return text[:SNIPPET_CHARS], []
+    start = max(0, hits[0][0] - SNIPPET_CHARS // 4)
+    end = min(len(text), start + SNIPPET_CHARS)
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    shift = len(prefix) - start
+    marks = [[a + shift, b + shift] for a, b in hits if a >= start and b <= end]
+    return prefix + text[start:end] + suffix, marks
+
+
+class _Doc:
+    __slots__ = ("response_id", "session_id", "field", "text", "length", "created_at")
+
+    def __init__(self, response_id, session_id, field, text, length, created_at):
+        self.response_id = response_id
+        self.session_id = session_id
+        self.field = field
+        self.text = text
+        self.length = length
+        self.created_at = created_at
+
+
+class FounderIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.docs: Dict[int, _Doc] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.by_response: Dict[str, List[int]] = {}
+        self.total_len = 0
+        self._next_id = 0
+        self.building = True
+        self.ready = threading.Event()
+        self.error: Optional[BaseException] = None     # set (with ready) if the load failed
+        self.pending: List[tuple] = []
+        # max created_at among loader rows; live writes from this worker must not advance it, or
+        # catch_up would skip older rows other workers wrote meanwhile. Edits keep their created_at,
+        # so only a rebuild picks up another worker's edit of an existing response.
+        self.watermark: Optional[str] = None
+        self.synced_at = 0.0
+        self.built_at = 0.0
+
+    def _remove(self, response_id: str):
+        for doc_id in self.by_response.pop(response_id, []):
+            doc = self.docs.pop(doc_id)
+            self.total_len -= doc.length
+            for term in set(tokenize(doc.text)):
+                plist = self.postings.get(term)
+                if plist is not None:
+                    plist.pop(doc_id, None)
+                    if not plist:
+                        del self.postings[term]
+
+    def upsert(self, response_id: str, session_id: str, created_at: Optional[str], answers: dict,
+               live: bool = False):
+        with self.lock:
+            if live and self.building:
+                self.pending.append((response_id, session_id, created_at, answers))
+            self._remove(response_id)
+            ids = []
+            for field, text in searchable_answers(answers):
+                tokens = tokenize(text)
+                if not tokens:
+                    continue
+                doc_id = self._next_id; self._next_id += 1
+                self.docs[doc_id] = _Doc(response_id, session_id, field, text, len(tokens), created_at)
+                self.total_len += len(tokens)
+                tf: Dict[str, int] = {}
+                for t in tokens:
+                    tf[t] = tf.get(t, 0) + 1
+                for t, n in tf.items():
+                    self.postings.setdefault(t, {})[doc_id] = n
+                ids.append(doc_id)
+            if ids:
+                self.by_response[response_id] = ids
+            if not live and created_at and (self.watermark is None or created_at > self.watermark):
+                self.watermark = created_at
+
+    def finish_build(self):
+        # live writes that raced the initial load are newer than what the loader saw
+        with self.lock:
+            self.building = False
+            pending, self.pending = self.pending, []
+            for args in pending:
+                self.upsert(*args, live=True)
+            self.built_at = self.synced_at = time.monotonic()
+        self.ready.set()
+
+    def search(self, query: str, session_id: Optional[str], limit: int, offset: int) -> dict:
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self.lock:
+            n = len(self.docs)
+            if not terms or not n:
+                return {"total": 0, "items": []}
+            avgdl = self.total_len / n
+            scores: Dict[int, float] = {}
+            for t in terms:
+                plist = self.postings.get(t)
+                if not plist:
+                    continue
+                idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+                for doc_id, tf in plist.items():
+                    doc = self.docs[doc_id]
+                    if session_id and doc.session_id != session_id:
+                        continue
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * doc.length / avgdl)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+            top = heapq.nlargest(offset + limit, scores.items(), key=lambda kv: kv[1])[offset:]
+            term_set = set(terms)
+            items = []
+            for doc_id, score in top:
+                doc = self.docs[doc_id]
+                text, marks = snippet(doc.text, term_set)
+                items.append({
+                    "response_id": doc.response_id,
+                    "session_id": doc.session_id,
+                    "field": doc.field,
+                    "created_at": doc.created_at,
+                    "score": round(score, 4),
+                    "snippet": text,
+                    "highlights": marks,
+                })
+            return {"total": len(scores), "items": items}
+
+
+# loader(founder_email, since_created_at or None) -> iterable of rows with id, session_id, created_at, answers
+Loader = Callable[[str, Optional[str]], Iterable[dict]]
+
+
+class SearchIndex:
+    def __init__(self, loader: Loader, max_founders: int = 256,
+                 refresh_seconds: float = 30, rebuild_seconds: float = 600):
+        self.loader = loader
+        self.max_founders = max_founders
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._indexes: "OrderedDict[str, FounderIndex]" = OrderedDict()    # ready, served to queries
+        self._building: Dict[str, FounderIndex] = {}
+        self._lock = threading.Lock()
+
+    def _fill(self, founder_email: str, idx: FounderIndex) -> FounderIndex:
+        """Load idx (registered in _building) and make it the index that queries use."""
+        try:
+            for row in self.loader(founder_email, None):
+                idx.upsert(row["id"], row["session_id"], row.get("created_at"), row.get("answers") or {})
+        except Exception as e:
+            with self._lock:
+                if self._building.get(founder_email) is idx:
+                    del self._building[founder_email]
+            idx.error = e
+            idx.ready.set()
+            raise
+        idx.finish_build()
+        with self._lock:
+            if self._building.get(founder_email) is idx:
+                del self._building[founder_email]
+            self._indexes[founder_email] = idx
+            self._indexes.move_to_end(founder_email)
+            while len(self._indexes) > self.max_founders:
+                self._indexes.popitem(last=False)
+        return idx
+
+    def _load(self, founder_email: str, retry: bool = True) -> FounderIndex:
+        """First load for a founder: nothing to serve yet, so wait for it (once per founder)."""
+        with self._lock:
+            idx = self._building.get(founder_email)
+            mine = idx is None
+            if mine:
+                idx = self._building[founder_email] = FounderIndex()
+        if mine:
+            return self._fill(founder_email, idx)
+        # another request is loading it; wait rather than load twice
+        if idx.ready.wait(timeout=self.rebuild_seconds) and idx.error is None:
+            return idx
+        if not retry:
+            raise RuntimeError(f"search index for {founder_email} could not be loaded") from idx.error
+        return self._load(founder_email, retry=False)
+
+    def _rebuild(self, founder_email: str, current: FounderIndex):
+        with self._lock:
+            if founder_email in self._building:
+                return
+            idx = self._building[founder_email] = FounderIndex()
+
+        def run():
+            try:
+                self._fill(founder_email, idx)
+            except Exception:
+                # keep serving the current index; try again after refresh_seconds, not on every query
+                current.built_at = time.monotonic() - self.rebuild_seconds + self.refresh_seconds
+
+        threading.Thread(target=run, name="search-rebuild", daemon=True).start()
+
+    def get(self, founder_email: str) -> FounderIndex:
+        with self._lock:
+            idx = self._indexes.get(founder_email)
+            if idx is not None:
+                self._indexes.move_to_end(founder_email)
+        if idx is None:
+            return self._load(founder_email)
+        now = time.monotonic()
+        if now - idx.built_at > self.rebuild_seconds:
+            self._rebuild(founder_email, idx)
+        if now - idx.synced_at > self.refresh_seconds:
+            self.catch_up(founder_email, idx)
+        return idx
+
+    def catch_up(self, founder_email: str, idx: FounderIndex):
+        """Index rows created (e.g. by other workers) since the newest one we have."""
+        for row in self.loader(founder_email, idx.watermark):
+            idx.upsert(row["id"], row["session_id"], row.get("created_at"), row.get("answers") or {})
+        idx.synced_at = time.monotonic()
+
+    def on_response(self, founder_email: str, response_id: str, session_id: str,
+                    created_at: Optional[str], answers: dict):
+        """Write-path hook; a no-op unless this founder's index is loaded or loading."""
+        with self._lock:
+            targets = [i for i in (self._indexes.get(founder_email), self._building.get(founder_email)) if i]
+        for idx in targets:
+            idx.upsert(response_id, session_id, created_at, answers, live=True)
+
+    def search(self, founder_email: str, query: str, session_id: Optional[str] = None,
+               limit: int = 20, offset: int = 0) -> dict:
+        return self.get(founder_email).search(query, session_id, limit, offset)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idxs = list(self._indexes.values())
+            building = len(self._building)
+        return {"founders": len(idxs), "documents": sum(len(i.docs) for i in idxs),
+                "terms": sum(len(i.postings) for i in idxs), "building": building}
@@ -0,0 +1,264 @@
+"""Small versioned key/value caches for hot lookups.
+
+``SharedCache`` lives in a memory-mapped file (``/dev/shm`` by default), so every
+uvicorn worker on the host reads and invalidates the same entries without an
+external service. Layout: a fixed header, then ``slots`` fixed-size slots found
+by open addressing on a 64-bit key hash. Readers are lock-free (per-slot seqlock:
+the sequence is odd while a slot is being written); writers take an ``flock`` on
+the file plus a thread lock.
+
+Every key carries a version. ``invalidate`` bumps it and drops the value, and
+``set(..., expected_version=v)`` only stores if the version is still ``v``, so a
+worker that loaded from the database before another worker's invalidation cannot
+put the stale row back. The tombstone carrying that version expires after
+``tombstone_ttl`` (longer than a load), so invalidations of keys that were never
+cached do not fill the table; until then it can only be evicted by a colliding
+key when every probed slot is taken, which reopens the window for one load.
+
+``LocalCache`` has the same interface for a single process; ``NullCache`` turns
+caching off.
+"""
+import fcntl, hashlib, json, mmap, os, struct, threading, time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+_MAGIC = b"VRTYCACH"
+_HEADER = struct.Struct("<8sIII")           # magic, format, slots, slot_size
+_HEADER_SIZE = 64
+_FORMAT = 1
+_SLOT = struct.Struct("<QQQdiH")             # seq, key hash, version, expires, length, key length
+_SLOT_HEADER = 40
+_PROBES = 8
+_TOMBSTONE = -1
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+
+class _Stats:
+    def __init__(self):
+        self.hits = self.misses = self.sets = self.stale_rejected = self.invalidations = self.oversize = 0
+
+    def as_dict(self, backend: str) -> dict:
+        lookups = self.hits + self.misses
+        return {"backend": backend, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "sets": self.sets, "stale_rejected": self.stale_rejected,
+                "invalidations": self.invalidations, "oversize": self.oversize}
+
+
+class SharedCache:
+    def __init__(self, path: str, slots: int = 4096, slot_size: int = 16384, tombstone_ttl: float = 10.0):
+        # layout in the name: workers started with other settings use their own file
+        # instead of re-initialising one that is mapped elsewhere
+        self.path = f"{path}-{slots}x{slot_size}"
+        self.slots = slots
+        self.slot_size = slot_size
+        self.tombstone_ttl = tombstone_ttl
+        self.stats = _Stats()
+        self._tlock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None
+
+    # -- file -----------------------------------------------------------------
+    def open(self):
+        if self._mm is not None:
+            return
+        with self._tlock:
+            if self._mm is not None:
+                return
+            size = _HEADER_SIZE + self.slots * self.slot_size
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                expected = _HEADER.pack(_MAGIC, _FORMAT, self.slots, self.slot_size)
+                if os.fstat(fd).st_size == 0:
+                    # new file: sparse, all-zero slots are empty
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, expected, 0)
+                elif os.pread(fd, _HEADER.size, 0) != expected or os.fstat(fd).st_size != size:
+                    os.close(fd)
+                    raise RuntimeError(f"{self.path} is not a cache file with this layout; remove it")
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._fd = fd
+            self._mm = mmap.mmap(fd, size)
+
+    def _off(self, i: int) -> int:
+        return _HEADER_SIZE + i * self.slot_size
+
+    def _read_slot(self, i: int, h: int, key: bytes) -> Optional[Tuple[int, float, int, bytes]]:
+        """(version, expires, length, value) if slot i holds key, read consistently."""
+        mm, off = self._mm, self._off(i)
+        for _ in range(4):
+            seq, kh, version, expires, length, klen = _SLOT.unpack_from(mm, off)
+            if seq & 1:
+                continue
+            if kh != h:
+                return None
+            body = mm[off + _SLOT_HEADER: off + _SLOT_HEADER + klen + max(length, 0)]
+            if _SLOT.unpack_from(mm, off)[0] != seq:
+                continue
+            if body[:klen] != key:
+                return None
+            return version, expires, length, body[klen:]
+        return None
+
+    def _write_slot(self, i: int, h: int, key: bytes, version: int, expires: float, length: int, value: bytes):
+        mm, off = self._mm, self._off(i)
+        seq = _SLOT.unpack_from(mm, off)[0]
+        struct.pack_into("<Q", mm, off, seq + 1)          # odd: readers retry
+        mm[off + _SLOT_HEADER: off + _SLOT_HEADER + len(key) + len(value)] = key + value
+        _SLOT.pack_into(mm, off, seq + 1, h, version, expires, length, len(key))
+        struct.pack_into("<Q", mm, off, seq + 2)
+
+    def _locate(self, h: int, key: bytes) -> Tuple[int, int]:
+        """(slot index, current version) for a write: the key's slot, else a free/expired one."""
+        start = h % self.slots
+        free = None
+        now = time.time()
+        for p in range(_PROBES):
+            i = (start + p) % self.slots
+            hit = self._read_slot(i, h, key)
+            if hit is not None:
+                return i, hit[0]
+            kh, expires = (_SLOT.unpack_from(self._mm, self._off(i))[k] for k in (1, 3))
+            if free is None and (kh == 0 or (expires and expires < now)):   # empty, expired or old tombstone
+                free = i
+        return (free if free is not None else start), 0
+
+    # -- API ------------------------------------------------------------------
+    def get(self, key: str) -> Tuple[Any, int]:
+        """(value or None, version); pass the version to set() as expected_version."""
+        self.open()
+        kb, h = key.encode(), _hash(key)
+        start = h % self.slots
+        version = 0
+        for p in range(_PROBES):
+            hit = self._read_slot((start + p) % self.slots, h, kb)
+            if hit is None:
+                continue
+            version, expires, length, value = hit
+            if length != _TOMBSTONE and not (expires and expires < time.time()):
+                self.stats.hits += 1
+                return json.loads(value), version
+            break
+        self.stats.misses += 1
+        return None, version
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expected_version: Optional[int] = None) -> bool:
+        self.open()
+        kb, h = key.encode(), _hash(key)
+        data = json.dumps(value, separators=(",", ":"), default=str).encode()
+        if _SLOT_HEADER + len(kb) + len(data) > self.slot_size:
+            self.stats.oversize += 1
+            return False
+        with self._tlock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                i, version = self._locate(h, kb)
+                if expected_version is not None and version != expected_version:
+                    self.stats.stale_rejected += 1
+                    return False
+                self._write_slot(i, h, kb, version, time.time() + ttl if ttl else 0.0, len(data), data)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self.stats.sets += 1
+        return True
+
+    def invalidate(self, key: str):
+        self.open()
+        kb, h = key.encode(), _hash(key)
+        with self._tlock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                i, version = self._locate(h, kb)
+                self._write_slot(i, h, kb, version + 1, time.time() + self.tombstone_ttl, _TOMBSTONE, b"")
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self.stats.invalidations += 1
+
+    def info(self) -> dict:
+        return {**self.stats.as_dict("shared"), "path": self.path, "slots": self.slots, "slot_size": self.slot_size}
+
+
+class LocalCache:
+    """Per-process LRU with the same versioned interface (invalidations stay in this worker).
+
+    Versions are kept for the ``max_entries`` most recently invalidated keys; like an evicted
+    tombstone in ``SharedCache``, forgetting an older one only matters to a load still in flight.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.stats = _Stats()
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+
+    def open(self):
+        pass
+
+    def get(self, key: str) -> Tuple[Any, int]:
+        with self._lock:
+            version = self._versions.get(key, 0)
+            item = self._data.get(key)
+            if item is not None and not (item[1] and item[1] < time.time()):
+                self._data.move_to_end(key)
+                self.stats.hits += 1
+                return item[0], version
+        self.stats.misses += 1
+        return None, version
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expected_version: Optional[int] = None) -> bool:
+        with self._lock:
+            if expected_version is not None and self._versions.get(key, 0) != expected_version:
+                self.stats.stale_rejected += 1
+                return False
+            self._data[key] = (value, time.time() + ttl if ttl else 0.0)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        self.stats.sets += 1
+        return True
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._versions.move_to_end(key)
+            while len(self._versions) > self.max_entries:
+                self._versions.popitem(last=False)
+        self.stats.invalidations += 1
+
+    def info(self) -> dict:
+        return {**self.stats.as_dict("local"), "entries": len(self._data), "versions": len(self._versions)}
+
+
+class NullCache:
+    def __init__(self):
+        self.stats = _Stats()
+
+    def open(self):
+        pass
+
+    def get(self, key: str) -> Tuple[Any, int]:
+        return None, 0
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, expected_version: Optional[int] = None) -> bool:
+        return False
+
+    def invalidate(self, key: str):
+        pass
+
+    def info(self) -> dict:
+        return {"backend": "none"}
+
+
+def make_cache(backend: str, path: str, slots: int, slot_size: int, max_entries: int):
+    if backend == "shared":
+        return SharedCache(path, slots=slots, slot_size=slot_size)
+    if backend == "local":
+        return LocalCache(max_entries=max_entries)
+    return NullCache()
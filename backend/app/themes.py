@@ -0,0 +1,248 @@
+"""Offline theme extraction for the anonymous headlines promised in the respondent copy.
+
+For each session, the free-text answers per problem (pb_N_reason + pb_N_attempts)
+are TF-IDF vectorized and grouped with spherical k-means; each cluster becomes a
+theme labelled by its top centroid terms. Pure Python, CPU only.
+
+Results are cached as data/themes/<session_id>.json together with a fingerprint of
+the session's response hashes, so a batch run only reprocesses sessions that got
+new or edited responses:
+
+    cd backend && python -m app.themes            # all sessions with responses
+    python -m app.themes --session <id> --force   # one session, ignore cache
+"""
+import argparse, hashlib, json, math, os, random, re, sys, time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .search import tokenize, norm_token, WORD_RE
+
+THEMES_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "themes")
+MAX_THEMES = 5
+MIN_THEME_SIZE = 2          # never surface a "theme" that is one person's answer
+TOP_TERMS = 4
+KMEANS_ITERATIONS = 20
+PAGE_SIZE = 1000
+
+_PB_FIELD = re.compile(r"^(pb_\d+)_(reason|attempts)$")
+SESSION_ID_RE = re.compile(r"^[A-Za-z0-9-]{1,64}$")    # uuids; also keeps ids out of the path
+
+STOPWORDS = set("""
+a about after all also am an and any are as at be because been but by can could did do does doing
+don dont for from get got had has have having he her him his how i if im in into is it its ive just
+like me more most much my no not now of on one only or other our out really so some such than that
+the their them then there these they thing things this those to too try tried trying up us very was
+we were what when where which while who why will with would yes you your
+""".split())
+
+
+def fingerprint(answer_hashes: Iterable[str]) -> str:
+    return hashlib.sha256("\n".join(sorted(h or "" for h in answer_hashes)).encode()).hexdigest()
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in tokenize(text) if t not in STOPWORDS and len(t) > 2 and not t.isdigit()]
+
+
+def _tfidf(docs: List[List[str]]) -> List[Dict[str, float]]:
+    df: Dict[str, int] = {}
+    for d in docs:
+        for t in set(d):
+            df[t] = df.get(t, 0) + 1
+    n = len(docs)
+    vecs = []
+    for d in docs:
+        tf: Dict[str, int] = {}
+        for t in d:
+            tf[t] = tf.get(t, 0) + 1
+        v = {t: (1 + math.log(c)) * math.log((1 + n) / (1 + df[t])) + 1e-9 for t, c in tf.items()}
+        vecs.append(_normalize(v))
+    return vecs
+
+
+def _normalize(v: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(x * x for x in v.values())) or 1.0
+    return {t: x / norm for t, x in v.items()}
+
+
+def _dot(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(x * b.get(t, 0.0) for t, x in a.items())
+
+
+def _kmeans(vecs: List[Dict[str, float]], k: int, seed: int = 0) -> List[int]:
+    rng = random.Random(seed)
+    # k-means++ style seeding on cosine distance, deterministic for a given input
+    centroids = [vecs[rng.randrange(len(vecs))]]
+    while len(centroids) < k:
+        dist = [1 - max(_dot(v, c) for c in centroids) for v in vecs]
+        total = sum(dist)
+        if total <= 0:
+            break
+        r, acc = rng.random() * total, 0.0
+        for v, d in zip(vecs, dist):
+            acc += d
+            if acc >= r:
+                centroids.append(v)
+                break
+    assign = [0] * len(vecs)
+    for it in range(KMEANS_ITERATIONS):
+        new = [max(range(len(centroids)), key=lambda i: _dot(v, centroids[i])) for v in vecs]
+        if it > 0 and new == assign:
+            break
+        assign = new
+        for i in range(len(centroids)):
+            members = [v for v, a in zip(vecs, assign) if a == i]
+            if members:
+                acc: Dict[str, float] = {}
+                for v in members:
+                    for t, x in v.items():
+                        acc[t] = acc.get(t, 0.0) + x
+                centroids[i] = _normalize(acc)
+    return assign
+
+
+def _surface_forms(texts: List[str]) -> Dict[str, str]:
+    # most frequent original spelling per normalized term, for readable labels
+    counts: Dict[str, Dict[str, int]] = {}
+    for text in texts:
+        for m in WORD_RE.finditer(text):
+            w = m.group(0).lower()
+            c = counts.setdefault(norm_token(w), {})
+            c[w] = c.get(w, 0) + 1
+    return {t: max(c, key=c.get) for t, c in counts.items()}
+
+
+def extract_themes(texts: List[str]) -> List[dict]:
+    docs = [_terms(t) for t in texts]
+    docs = [d for d in docs if d]
+    if len(docs) < MIN_THEME_SIZE:
+        return []
+    surface = _surface_forms(texts)
+    vecs = _tfidf(docs)
+    k = max(1, min(MAX_THEMES, math.ceil(math.sqrt(len(docs)))))
+    assign = _kmeans(vecs, k)
+    themes = []
+    for i in set(assign):
+        members = [v for v, a in zip(vecs, assign) if a == i]
+        if len(members) < MIN_THEME_SIZE:
+            continue
+        weight: Dict[str, float] = {}
+        support: Dict[str, int] = {}
+        for v in members:
+            for t, x in v.items():
+                weight[t] = weight.get(t, 0.0) + x
+                support[t] = support.get(t, 0) + 1
+        # label terms must recur inside the cluster, not come from a single answer
+        ranked = sorted((t for t in weight if support[t] >= MIN_THEME_SIZE), key=lambda t: -weight[t])
+        if not ranked:
+            continue
+        themes.append({"terms": [surface.get(t, t) for t in ranked[:TOP_TERMS]], "responses": len(members),
+                       "share": round(len(members) / len(docs), 3)})
+    return sorted(themes, key=lambda th: -th["responses"])
+
+
+def session_themes(session_id: str, rows: List[dict], questions: List[dict], fp: str) -> dict:
+    labels = {q.get("key"): q.get("problem") for q in questions or [] if q.get("type") == "problem_block"}
+    per_problem: Dict[str, List[str]] = {}
+    for r in rows:
+        joined: Dict[str, List[str]] = {}
+        for field, value in (r.get("answers") or {}).items():
+            m = _PB_FIELD.match(field)
+            if m and isinstance(value, str) and value.strip():
+                joined.setdefault(m.group(1), []).append(value)
+        for pb, parts in joined.items():
+            per_problem.setdefault(pb, []).append(" ".join(parts))
+    problems = {}
+    for pb in sorted(per_problem, key=lambda k: int(k.split("_")[1])):
+        problems[pb] = {"problem": labels.get(pb), "responses": len(per_problem[pb]),
+                        "themes": extract_themes(per_problem[pb])}
+    return {"session_id": session_id, "fingerprint": fp, "responses": len(rows),
+            "generated_at_utc": datetime.utcnow().isoformat(), "problems": problems}
+
+
+# -----------------------------------------------------------------------------
+# Cache
+# -----------------------------------------------------------------------------
+def _cache_path(session_id: str, cache_dir: str) -> str:
+    if not SESSION_ID_RE.match(session_id or ""):
+        raise ValueError(f"invalid session id: {session_id!r}")
+    return os.path.join(cache_dir, f"{session_id}.json")
+
+
+def load_cached(session_id: str, cache_dir: str = THEMES_DIR) -> Optional[dict]:
+    try:
+        with open(_cache_path(session_id, cache_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _store(result: dict, cache_dir: str):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(result["session_id"], cache_dir)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# -----------------------------------------------------------------------------
+# Batch
+# -----------------------------------------------------------------------------
+def _paged(query_fn):
+    start = 0
+    while True:
+        rows = query_fn().range(start, start + PAGE_SIZE - 1).execute().data or []
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        start += PAGE_SIZE
+
+
+def run_batch(client, cache_dir: str = THEMES_DIR, session_ids: Optional[List[str]] = None,
+              force: bool = False, log=print) -> dict:
+    t0 = time.monotonic()
+    # slim pass: only hashes, to decide which sessions changed
+    hashes: Dict[str, List[str]] = {}
+    def slim():
+        q = client.table("responses").select("session_id, answer_hash")
+        if session_ids: q = q.in_("session_id", session_ids)
+        return q.order("id")
+    for r in _paged(slim):
+        hashes.setdefault(r["session_id"], []).append(r.get("answer_hash"))
+
+    stats = {"sessions": len(hashes), "processed": 0, "unchanged": 0}
+    for sid, hs in hashes.items():
+        fp = fingerprint(hs)
+        cached = load_cached(sid, cache_dir)
+        if not force and cached and cached.get("fingerprint") == fp:
+            stats["unchanged"] += 1
+            continue
+        rows = list(_paged(lambda: client.table("responses").select("answers").eq("session_id", sid).order("id")))
+        sess = client.table("sessions").select("questions").eq("id", sid).limit(1).execute().data
+        questions = sess[0].get("questions") if sess else []
+        _store(session_themes(sid, rows, questions, fp), cache_dir)
+        stats["processed"] += 1
+        log(f"themes: {sid} ({len(rows)} responses)")
+    stats["seconds"] = round(time.monotonic() - t0, 2)
+    return stats
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Extract per-problem answer themes for sessions.")
+    ap.add_argument("--session", action="append", dest="sessions", help="limit to this session id (repeatable)")
+    ap.add_argument("--force", action="store_true", help="recompute even if responses are unchanged")
+    ap.add_argument("--cache-dir", default=THEMES_DIR)
+    args = ap.parse_args(argv)
+
+    from . import main as backend
+    backend._ensure_sb()
+    stats = run_batch(backend.sb, args.cache_dir, args.sessions, args.force)
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Startup benchmark: import time of app.main against a budget.
+
+Run from backend/:
+    python scripts/bench_startup.py            # budget from IMPORT_BUDGET_MS (default 800)
+    python scripts/bench_startup.py --runs 7 --budget-ms 1200
+
+Each run imports the app in a fresh interpreter, so nothing is cached between runs.
+Exits non-zero if the median import time exceeds the budget or if a deferred
+heavy dependency (supabase, pycryptodome) is pulled in at import time.
+"""
+import argparse, json, os, statistics, subprocess, sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# modules that must only load on first use / during warmup, never at import
+DEFERRED = ["supabase", "Crypto"]
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+dt = (time.perf_counter() - t0) * 1000
+print(json.dumps({"ms": dt, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED,)
+
+
+def _one_run() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "800")))
+    args = ap.parse_args()
+
+    runs = [_one_run() for _ in range(args.runs)]
+    times = [r["ms"] for r in runs]
+    median = statistics.median(times)
+    leaked = sorted({m for r in runs for m in r["loaded"]})
+
+    print(f"import app.main: median {median:.1f} ms, min {min(times):.1f} ms, "
+          f"max {max(times):.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if leaked:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(leaked)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"FAIL: median import time over budget by {median - args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
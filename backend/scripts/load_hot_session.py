@@ -0,0 +1,101 @@
+"""Load test: does a hot session hurt everyone else?
+
+Measures /session_questions latency for a set of "other" sessions twice: alone
+(baseline) and while --spike-concurrency clients hammer POST /responses_sb on one
+hot session. Run it against a staging server with real session ids:
+
+    python scripts/load_hot_session.py --base-url http://localhost:8000 \
+        --hot-session <sid> --other-session <sid2> --other-session <sid3>
+
+Exits non-zero if p95 latency of the other sessions grows by more than
+--max-slowdown during the spike. Shed responses (429/503) from the spike are
+counted, not treated as errors; /metrics is printed at the end.
+"""
+import argparse, asyncio, json, statistics, sys, time
+from collections import Counter
+
+import httpx
+
+
+def _p(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def _readers(client, sessions, concurrency, duration):
+    lat, codes = [], Counter()
+    deadline = time.monotonic() + duration
+
+    async def one(i):
+        n = 0
+        while time.monotonic() < deadline:
+            sid = sessions[(i + n) % len(sessions)]; n += 1
+            t = time.perf_counter()
+            r = await client.get("/session_questions", params={"session_id": sid})
+            lat.append((time.perf_counter() - t) * 1000)
+            codes[r.status_code] += 1
+
+    await asyncio.gather(*(one(i) for i in range(concurrency)))
+    return lat, codes
+
+
+async def _spike(client, session_id, concurrency, duration):
+    codes = Counter()
+    deadline = time.monotonic() + duration
+
+    async def one(i):
+        n = 0
+        while time.monotonic() < deadline:
+            n += 1
+            body = {"session_id": session_id, "tester_email": f"load{i}_{n}@example.com",
+                    "answers": {"context": f"load test {i}/{n}"}}
+            r = await client.post("/responses_sb", json=body)
+            codes[r.status_code] += 1
+            if r.status_code in (429, 503):
+                # well-behaved client: honour Retry-After, but cap it so the spike stays a spike
+                await asyncio.sleep(min(float(r.headers.get("retry-after", "1")), 0.5))
+
+    await asyncio.gather(*(one(i) for i in range(concurrency)))
+    return codes
+
+
+def _report(name, lat, codes):
+    print(f"{name:>9}: n={len(lat)} p50={_p(lat, .5):.1f}ms p95={_p(lat, .95):.1f}ms "
+          f"p99={_p(lat, .99):.1f}ms codes={dict(codes)}")
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--base-url", default="http://localhost:8000")
+    ap.add_argument("--hot-session", required=True)
+    ap.add_argument("--other-session", action="append", required=True)
+    ap.add_argument("--duration", type=float, default=20)
+    ap.add_argument("--read-concurrency", type=int, default=10)
+    ap.add_argument("--spike-concurrency", type=int, default=200)
+    ap.add_argument("--max-slowdown", type=float, default=2.0, help="allowed p95 ratio spike/baseline")
+    args = ap.parse_args()
+
+    limits = httpx.Limits(max_connections=args.read_concurrency + args.spike_concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30, limits=limits) as client:
+        base_lat, base_codes = await _readers(client, args.other_session, args.read_concurrency, args.duration)
+        _report("baseline", base_lat, base_codes)
+
+        (spike_lat, spike_codes), hot_codes = await asyncio.gather(
+            _readers(client, args.other_session, args.read_concurrency, args.duration),
+            _spike(client, args.hot_session, args.spike_concurrency, args.duration),
+        )
+        _report("spike", spike_lat, spike_codes)
+        print(f"hot session writes: {dict(hot_codes)}")
+        print(json.dumps((await client.get("/metrics")).json().get("admission"), indent=2))
+
+    ratio = _p(spike_lat, .95) / _p(base_lat, .95)
+    ok_rate = spike_codes.get(200, 0) / max(1, sum(spike_codes.values()))
+    print(f"other sessions p95 slowdown x{ratio:.2f} (limit x{args.max_slowdown}), "
+          f"success {ok_rate:.1%}, baseline median {statistics.median(base_lat):.1f}ms")
+    return 0 if ratio <= args.max_slowdown and ok_rate >= 0.99 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
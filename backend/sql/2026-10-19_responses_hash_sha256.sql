@@ -0,0 +1,6 @@
+-- Keep the SHA-256 that file mode recorded for each response (python -m app.migrate_files).
+alter table public.responses
+  add column if not exists hash_sha256 text;
+
+-- Reminder to refresh Supabase schema cache (run in dashboard SQL):
+-- select pg_notify('pgrst', 'reload schema');
@@ -0,0 +1,25 @@
+-- Server-side answer preview so list views (/session_responses) don't need the answers blob.
+-- New rows get it from POST /responses_sb; this backfills existing rows.
+alter table public.responses
+  add column if not exists preview text;
+
+-- Same shape as the API preview: first 3 answers, "key=value" with values cut at 40 chars.
+-- (jsonb does not keep insertion order, so "first 3" can differ from the original payload.)
+update public.responses r
+set preview = p.preview
+from (
+  select id,
+         string_agg(key || '=' || case when length(value) > 40 then left(value, 40) || '…' else value end,
+                    ', ' order by ord) as preview
+  from (
+    select r2.id, e.key, e.value, e.ord
+    from public.responses r2,
+         lateral jsonb_each_text(r2.answers) with ordinality as e(key, value, ord)
+  ) x
+  where ord <= 3
+  group by id
+) p
+where r.id = p.id and r.preview is null;
+
+-- Reminder to refresh Supabase schema cache (run in dashboard SQL):
+-- select pg_notify('pgrst', 'reload schema');
@@ -0,0 +1,87 @@
+import os, sys, threading, time, uuid
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class StubSupabase:
+    """Just enough of the supabase-py query builder for the endpoints under test.
+
+    Every execute() sleeps ``latency`` seconds to stand in for the network round trip.
+    """
+
+    def __init__(self, sessions: dict, latency: float = 0.005):
+        self.sessions = sessions            # id -> {"founder_email", "questions"}
+        self.latency = latency
+        self.testers: dict = {}
+        self.responses: dict = {}
+        self.calls = 0
+        self.selects: list = []             # (table, columns) of every select()
+        self._lock = threading.Lock()
+
+    def table(self, name: str):
+        return _Query(self, name)
+
+
+class _Query:
+    def __init__(self, db: StubSupabase, table: str):
+        self.db, self.table = db, table
+        self.op, self.row, self.filters, self.is_single = "select", None, {}, False
+
+    def select(self, *cols):
+        self.db.selects.append((self.table, ", ".join(cols)))
+        return self
+
+    def eq(self, col, value):
+        self.filters[col] = value
+        return self
+
+    def limit(self, *_):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def single(self):
+        self.is_single = True
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.op, self.row = "upsert", row
+        return self
+
+    def insert(self, row):
+        self.op, self.row = "insert", row
+        return self
+
+    def execute(self):
+        time.sleep(self.db.latency)
+        with self.db._lock:
+            self.db.calls += 1
+            data = self._run()
+        if self.is_single:
+            data = data[0] if data else None
+        return SimpleNamespace(data=data)
+
+    def _run(self):
+        db = self.db
+        if self.table == "sessions":
+            s = db.sessions.get(self.filters.get("id"))
+            return [dict(s)] if s else []
+        if self.table == "testers":
+            if self.op == "select":
+                t = db.testers.get(self.filters.get("email"))
+                return [t] if t else []
+            t = db.testers.setdefault(self.row["email"], {"id": str(uuid.uuid4()), "email": self.row["email"]})
+            return [t]
+        if self.table == "responses":
+            if self.op == "select":
+                key = (self.filters.get("session_id"), self.filters.get("tester_id"))
+                return [{"id": db.responses[key]["id"]}] if key in db.responses else []
+            key = (self.row["session_id"], self.row["tester_id"])
+            prev = db.responses.get(key)
+            row = {**self.row, "id": prev["id"] if prev else str(uuid.uuid4()),
+                   "created_at": prev["created_at"] if prev else "2026-10-19T00:00:00+00:00"}
+            db.responses[key] = row
+            return [row]
+        raise AssertionError(f"unexpected table {self.table}")
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.feed import ResponseFeed
+
+
+def test_every_subscription_starts_with_resync():
+    async def run():
+        feed = ResponseFeed(buffer_size=4)
+        sub = feed.subscribe("f@example.com")
+        feed.publish("f@example.com", {"type": "response", "session_id": "s1", "responses_delta": 1})
+        await asyncio.sleep(0)
+        first, second = await sub.get(), await sub.get()
+        assert first == {"type": "resync", "reason": "subscribed"}
+        assert second["type"] == "response" and second["seq"] == 1
+        # a reconnect (new subscription) gets its own resync, missed events are not replayed
+        feed.unsubscribe(sub)
+        feed.publish("f@example.com", {"type": "response", "session_id": "s1", "responses_delta": 1})
+        again = feed.subscribe("f@example.com")
+        assert await again.get() == {"type": "resync", "reason": "subscribed"}
+        assert again.queue.empty()
+        assert feed.stats()["resyncs"] == 0
+
+    asyncio.run(run())
+
+
+def test_stream_subscribes_only_once_the_body_runs():
+    pytest.importorskip("fastapi")
+    from app import main
+
+    class _Req:
+        async def is_disconnected(self):
+            return False
+
+    async def run():
+        resp = await main.founder_sessions_stream(_Req(), "F@example.com")
+        # client gone before the body started: nothing may stay registered
+        assert not main._feed.has_subscribers("f@example.com")
+        body = resp.body_iterator
+        assert await body.__anext__() == "retry: 3000\n\n"
+        assert main._feed.has_subscribers("f@example.com")
+        assert (await body.__anext__()).startswith("id: \nevent: resync\n")
+        await body.aclose()
+        assert not main._feed.has_subscribers("f@example.com")
+
+    asyncio.run(run())
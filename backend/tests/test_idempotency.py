@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from conftest import StubSupabase
+
+
+def _submit(main, bodies_and_headers):
+    httpx = pytest.importorskip("httpx")
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.post("/responses_sb", json=b, headers=h) for b, h in bodies_and_headers]
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def app_main(monkeypatch):
+    pytest.importorskip("fastapi")
+    from app import main
+    from app.shared_cache import LocalCache
+
+    sessions = {"s1": {"founder_email": "founder@example.com", "questions": []}}
+    monkeypatch.setattr(main, "sb", StubSupabase(sessions, latency=0))
+    monkeypatch.setattr(main, "_idempotency", LocalCache(max_entries=100))
+    monkeypatch.setattr(main, "_idempotency_stats", {"writes_avoided": 0, "key_conflicts": 0, "in_flight_waits": 0})
+    monkeypatch.setattr(main, "ADMISSION_ENABLED", False)
+    return main
+
+
+def _body(answer):
+    return {"session_id": "s1", "tester_email": "t@example.com", "answers": {"context": answer}}
+
+
+def test_without_shared_store_only_header_requests_are_deduplicated(app_main):
+    assert app_main._IDEMPOTENCY_SHARED is False        # CACHE_BACKEND=none in tests
+    rs = _submit(app_main, [(_body("A"), {}), (_body("B"), {}), (_body("A"), {})])
+    assert [r.status_code for r in rs] == [200, 200, 200]
+    # every edit reaches the database, including the return to A
+    assert app_main.sb.responses[("s1", app_main.sb.testers["t@example.com"]["id"])]["answers"] == {"context": "A"}
+    assert app_main._idempotency_stats["writes_avoided"] == 0
+
+    rs = _submit(app_main, [(_body("C"), {"Idempotency-Key": "k1"}), (_body("C"), {"Idempotency-Key": "k1"}),
+                            (_body("D"), {"Idempotency-Key": "k1"})])
+    assert [r.status_code for r in rs] == [200, 200, 422]
+    assert rs[1].json() == rs[0].json()
+    assert app_main._idempotency_stats == {"writes_avoided": 1, "key_conflicts": 1, "in_flight_waits": 0}
+
+
+def test_shared_store_dedupes_by_tester(app_main, monkeypatch):
+    monkeypatch.setattr(app_main, "_IDEMPOTENCY_SHARED", True)
+    rs = _submit(app_main, [(_body("A"), {}), (_body("A"), {}), (_body("B"), {}), (_body("A"), {})])
+    assert [r.status_code for r in rs] == [200] * 4
+    assert app_main._idempotency_stats["writes_avoided"] == 1
+    assert app_main.sb.responses[("s1", app_main.sb.testers["t@example.com"]["id"])]["answers"] == {"context": "A"}
+
+
+def _concurrent(main, bodies_and_headers):
+    httpx = pytest.importorskip("httpx")
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async def post(b, h, delay):
+                await asyncio.sleep(delay)
+                return await client.post("/responses_sb", json=b, headers=h)
+            return await asyncio.gather(*(post(b, h, 0.05 * n) for n, (b, h) in enumerate(bodies_and_headers)))
+
+    return asyncio.run(run())
+
+
+def test_retry_of_in_flight_submit_waits_for_the_original(app_main):
+    app_main.sb.latency = 0.05                 # the original is still writing when the retry arrives
+    rs = _concurrent(app_main, [(_body("A"), {"Idempotency-Key": "k1"}), (_body("A"), {"Idempotency-Key": "k1"})])
+    assert [r.status_code for r in rs] == [200, 200]
+    assert rs[0].json() == rs[1].json()
+    upserts = [t for t, _ in app_main.sb.selects if t == "testers"]
+    assert len(upserts) == 1                   # the retry did no lookups of its own
+    assert app_main._idempotency_stats["in_flight_waits"] == 1
+    assert app_main._idempotency_stats["writes_avoided"] == 1
+
+
+def test_failed_original_lets_the_retry_write(app_main, monkeypatch):
+    real = app_main._store_response
+    calls = []
+
+    def flaky(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError("database down")
+        return real(*args)
+
+    monkeypatch.setattr(app_main, "_store_response", flaky)
+    with pytest.raises(RuntimeError):
+        _submit(app_main, [(_body("A"), {"Idempotency-Key": "k1"})])
+    rs = _submit(app_main, [(_body("A"), {"Idempotency-Key": "k1"})])
+    assert rs[0].status_code == 200 and len(calls) == 2
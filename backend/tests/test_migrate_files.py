@@ -0,0 +1,83 @@
+import json, os, time
+
+import pytest
+
+pytest.importorskip("fastapi")
+from app import migrate_files as mf
+
+
+def _write(dirpath, name, doc, mtime=None):
+    path = os.path.join(dirpath, name)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_batches_never_split_a_group():
+    names = ["a1", "a2", "a3", "b1", "c1", "c2"]
+    batches = list(mf._batches(names, 2, lambda n: n[0]))
+    assert batches == [["a1", "a2", "a3"], ["b1", "c1", "c2"]]
+    assert list(mf._batches([], 2, lambda n: n)) == []
+
+
+def test_response_key_groups_on_canonical_tester():
+    names = ["20260102_s1_A@x.com_bbbbbbbbbbbb.json", "20260101_s1_a@x.com_aaaaaaaaaaaa.json",
+             "20260101_s1_b@x.com_cccccccccccc.json", "20260101_s1_anon_1_dddddddddddd.json"]
+    ordered = sorted(names, key=mf._response_key)
+    group = lambda n: mf._response_key(n)[:2]
+    assert group(ordered[0]) == group(ordered[1]) == ("s1", "a@x.com")
+    # same tester: oldest first, so the newest file wins inside the batch
+    assert ordered[:2] == ["20260101_s1_a@x.com_aaaaaaaaaaaa.json", "20260102_s1_A@x.com_bbbbbbbbbbbb.json"]
+    assert [group(n) for n in ordered[2:]] == [("s1", "b@x.com"), ("s1", "file_anon_1@file.local")]
+
+
+def test_run_phase_resumes_after_checkpoint_and_picks_up_late_files(tmp_path):
+    src = tmp_path / "sessions"; src.mkdir()
+    old = time.time() - 3600
+    for i in range(6):
+        _write(str(src), f"2026010{i}_s{i}.json", {"session_id": f"s{i}"}, mtime=old)
+    ckpt_path = str(tmp_path / "ckpt.json")
+    seen, fail = [], {"on": "20260104_s4.json"}
+
+    def work(batch):
+        if fail["on"] in batch:
+            raise RuntimeError("database down")
+        seen.extend(batch)
+        return {"files": len(batch)}
+
+    names = mf._list(str(src), mf._session_key)
+    mf.RETRIES, retries = 1, mf.RETRIES
+    try:
+        with pytest.raises(RuntimeError):
+            mf.run_phase("sessions", names, mf._session_key, work, mf.Checkpoint(ckpt_path), 1, 2,
+                         log=lambda *_: None, dirpath=str(src))
+    finally:
+        mf.RETRIES = retries
+    assert seen == names[:4]
+    assert mf.Checkpoint(ckpt_path).data["sessions"] == "20260103_s3.json"
+
+    # written by the live file-mode endpoint meanwhile; sorts before the mark
+    _write(str(src), "20260101_s9.json", {"session_id": "s9"})
+    seen.clear(); fail["on"] = None
+    names = mf._list(str(src), mf._session_key)
+    totals = mf.run_phase("sessions", names, mf._session_key, work, mf.Checkpoint(ckpt_path), 1, 2,
+                          log=lambda *_: None, dirpath=str(src))
+    assert seen == ["20260101_s9.json", "20260104_s4.json", "20260105_s5.json"]
+    assert totals["files"] == 3
+    assert mf.Checkpoint(ckpt_path).data["sessions"] == "20260105_s5.json"
+
+
+def test_responses_of_unreadable_sessions_are_orphaned(tmp_path, capsys):
+    sessions, responses = tmp_path / "sessions", tmp_path / "responses"
+    sessions.mkdir(); responses.mkdir()
+    (sessions / "20260101_sid1.json").write_text("{not json", encoding="utf-8")
+    _write(str(sessions), "20260101_sid2.json", {"session_id": "sid2", "founder_inputs": {}})
+    for sid in ("sid1", "sid2"):
+        _write(str(responses), f"20260102_{sid}_t@x.com_aaaaaaaaaaaa.json",
+               {"payload": {"session_id": sid, "respondent_id": "t@x.com", "answers": {"context": "hi"}}})
+
+    assert mf.main(["--dry-run", "--sessions-dir", str(sessions), "--responses-dir", str(responses)]) == 0
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert summary["sessions"]["skipped"] == 1
+    assert (summary["responses"]["written"], summary["responses"]["orphaned"]) == (1, 1)
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi import HTTPException
+
+from app import main
+from conftest import StubSupabase
+
+
+def test_parse_fields():
+    allowed = ("id", "created_at", "answers")
+    assert main._parse_fields(None, allowed) == list(allowed)
+    assert main._parse_fields(" ", allowed) == list(allowed)
+    assert main._parse_fields("answers, id", allowed) == ["id", "answers"]     # allowed order, not request order
+    with pytest.raises(HTTPException) as e:
+        main._parse_fields("id,secret", allowed)
+    assert e.value.status_code == 400 and "secret" in e.value.detail
+
+
+def test_tester_responses_select():
+    assert main._tester_responses_select(["id"]) == "id, sessions!inner(founder_inputs!inner(id))"
+    assert main._tester_responses_select(["id", "company_name", "session_status", "paid"]) == (
+        "id, paid, sessions!inner(status, founder_inputs!inner(founder_display_name, founder_email))")
+    full = main._tester_responses_select(list(main._TESTER_RESPONSE_FIELDS))
+    assert full.startswith("id, session_id, created_at, answer_hash, answers, founder_email, payment_amount, paid, ")
+
+
+@pytest.mark.parametrize("include_answers, fields, selects_answers", [
+    (False, None, False),                 # default payload: no blob
+    (False, "", False),                   # empty fields= is the default payload
+    (True, None, True),
+    (False, "id,answers", True),
+    (True, "id,preview", False),          # asked for answers but projected them away
+])
+def test_session_responses_selects_answers_only_when_returned(monkeypatch, include_answers, fields, selects_answers):
+    db = StubSupabase({}, latency=0)
+    monkeypatch.setattr(main, "sb", db)
+    main.session_responses("s1", include_answers=include_answers, fields=fields)
+    cols = [c for table, c in db.selects if table == "responses"]
+    assert len(cols) == 1
+    assert ("answers" in cols[0].split(", ")) is selects_answers
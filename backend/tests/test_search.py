@@ -0,0 +1,82 @@
+import threading, time
+
+from app.search import SearchIndex
+
+
+def test_catch_up_sees_rows_older_than_local_live_writes():
+    rows = [{"id": "r1", "session_id": "s1", "created_at": "2026-10-19T10:00:00", "answers": {"context": "slow sync"}}]
+
+    def loader(founder_email, since):
+        return [r for r in rows if since is None or r["created_at"] > since]
+
+    search = SearchIndex(loader, refresh_seconds=3600)
+    idx = search.get("f@example.com")
+    # this worker stores a response...
+    search.on_response("f@example.com", "r3", "s1", "2026-10-19T10:05:00", {"context": "pricing too high"})
+    # ...while another worker stored an earlier one this index has not seen yet
+    rows.append({"id": "r2", "session_id": "s1", "created_at": "2026-10-19T10:02:00",
+                 "answers": {"context": "notifications are noisy"}})
+    search.catch_up("f@example.com", idx)
+    assert [h["response_id"] for h in search.search("f@example.com", "notification")["items"]] == ["r2"]
+    assert idx.watermark == "2026-10-19T10:02:00"
+
+
+def _rows(n, text="notifications are noisy"):
+    return [{"id": f"r{i}", "session_id": "s1", "created_at": f"2026-10-19T10:{i // 60:02d}:{i % 60:02d}",
+             "answers": {"context": text}} for i in range(n)]
+
+
+def test_rebuild_keeps_serving_the_current_index():
+    rows = _rows(300)
+
+    def slow_loader(founder_email, since):
+        for r in rows:
+            if since is None or r["created_at"] > since:
+                time.sleep(0.001)             # ~0.3 s for a full load
+                yield r
+
+    search = SearchIndex(slow_loader, refresh_seconds=3600, rebuild_seconds=3600)
+    old = search.get("f@example.com")
+    old.built_at -= 7200                       # due for a rebuild
+    rows[0] = {**rows[0], "answers": {"context": "pricing edited later"}}   # an edit only a rebuild sees
+
+    t = time.perf_counter()
+    res = search.search("f@example.com", "notification", limit=1)
+    assert time.perf_counter() - t < 0.1
+    assert res["total"] == 300                 # served from the current index while the new one loads
+    assert search.stats()["building"] == 1
+
+    deadline = time.monotonic() + 5
+    while search.stats()["building"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert search.get("f@example.com") is not old
+    assert search.search("f@example.com", "notification")["total"] == 299
+    assert search.search("f@example.com", "pricing")["total"] == 1
+
+
+def test_waiter_retries_after_a_failed_first_load():
+    calls = []
+
+    def flaky_loader(founder_email, since):
+        calls.append(since)
+        if len(calls) == 1:
+            time.sleep(0.1)
+            raise ConnectionError("supabase down")
+        return _rows(3)
+
+    search = SearchIndex(flaky_loader)
+    results = {}
+
+    def query(name):
+        try:
+            results[name] = search.search("f@example.com", "notification")["total"]
+        except Exception as e:
+            results[name] = e
+
+    first = threading.Thread(target=query, args=("first",)); first.start()
+    time.sleep(0.02)
+    waiter = threading.Thread(target=query, args=("waiter",)); waiter.start()
+    first.join(); waiter.join()
+    assert isinstance(results["first"], ConnectionError)
+    assert results["waiter"] == 3              # not an empty, half-built index
+    assert len(calls) == 2
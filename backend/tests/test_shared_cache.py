@@ -0,0 +1,61 @@
+import json, os, subprocess, sys, time
+
+from app.shared_cache import LocalCache, SharedCache
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+
+
+def _in_other_process(path: str, code: str):
+    """Run code against a SharedCache on the same file in a fresh interpreter; returns its JSON output."""
+    script = f"import json\nfrom app.shared_cache import SharedCache\nc = SharedCache({path!r}, slots=64, slot_size=512)\n{code}"
+    out = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out) if out.strip() else None
+
+
+def test_shared_cache_across_processes(tmp_path):
+    path = str(tmp_path / "cache")
+    c = SharedCache(path, slots=64, slot_size=512)
+    assert c.set("session:s1", {"questions": [1, 2]})
+    assert _in_other_process(path, "print(json.dumps(c.get('session:s1')))") == [{"questions": [1, 2]}, 0]
+
+    # a load that started before another worker's invalidation cannot store its stale row
+    _, version = c.get("session:s1")
+    _in_other_process(path, "c.invalidate('session:s1')")
+    assert c.get("session:s1") == (None, version + 1)
+    assert not c.set("session:s1", {"questions": ["stale"]}, expected_version=version)
+    assert c.stats.stale_rejected == 1
+    assert c.set("session:s1", {"questions": [3]}, expected_version=version + 1)
+    assert _in_other_process(path, "print(json.dumps(c.get('session:s1')))") == [{"questions": [3]}, version + 1]
+
+    _in_other_process(path, "c.set('tester:a@example.com', {'id': 't1'}, ttl=60)")
+    assert c.get("tester:a@example.com")[0] == {"id": "t1"}
+
+
+def test_local_cache_versions_are_bounded():
+    c = LocalCache(max_entries=10)
+    for i in range(1000):
+        c.invalidate(f"k{i}")
+    assert len(c._versions) == 10
+    assert c.get("k999") == (None, 1)
+
+
+def test_expired_tombstones_are_reused(tmp_path):
+    def readable(c):
+        for i in range(100):
+            c.set(f"session:s{i}", {"i": i})
+        return sum(c.get(f"session:s{i}")[0] == {"i": i} for i in range(100))
+
+    c = SharedCache(str(tmp_path / "cache"), slots=256, slot_size=512, tombstone_ttl=0.05)
+    for i in range(2000):                     # write path invalidating keys that were never cached
+        c.invalidate(f"summary:s{i}")
+    time.sleep(0.1)
+    # as many survive as in an empty table (open addressing can still lose a key to a full probe window)
+    assert readable(c) == readable(SharedCache(str(tmp_path / "fresh"), slots=256, slot_size=512)) >= 98
+
+
+def test_live_tombstone_still_rejects_stale_set(tmp_path):
+    c = SharedCache(str(tmp_path / "cache"), slots=64, slot_size=512, tombstone_ttl=60)
+    _, version = c.get("session:s1")
+    c.invalidate("session:s1")
+    assert not c.set("session:s1", {"stale": True}, expected_version=version)
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import themes
+
+
+class _ThemesDB:
+    """responses/sessions tables for run_batch; records which sessions had their answers read."""
+
+    def __init__(self, responses, questions):
+        self.responses = responses          # list of {"id", "session_id", "answer_hash", "answers"}
+        self.questions = questions          # session id -> questions
+        self.answer_reads = []
+
+    def table(self, name):
+        return _ThemesQuery(self, name)
+
+
+class _ThemesQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.cols, self.eqs, self.ins, self.window = db, table, "", {}, {}, None
+
+    def select(self, cols):
+        self.cols = cols
+        return self
+
+    def eq(self, col, value):
+        self.eqs[col] = value
+        return self
+
+    def in_(self, col, values):
+        self.ins[col] = values
+        return self
+
+    def order(self, *_):
+        return self
+
+    def limit(self, *_):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def execute(self):
+        if self.table == "sessions":
+            rows = [{"id": sid, "questions": q} for sid, q in self.db.questions.items()]
+        else:
+            rows = self.db.responses
+            if "answers" in self.cols:
+                self.db.answer_reads.append(self.eqs.get("session_id"))
+        rows = [r for r in rows if all(r.get(c) == v for c, v in self.eqs.items())
+                and all(r.get(c) in v for c, v in self.ins.items())]
+        if self.window:
+            rows = rows[self.window[0]:self.window[1]]
+        return SimpleNamespace(data=rows)
+
+
+def _response(i, sid, text):
+    return {"id": i, "session_id": sid, "answer_hash": f"h{i}", "answers": {"pb_1_reason": text}}
+
+
+def test_run_batch_only_reprocesses_changed_sessions(tmp_path):
+    questions = [{"type": "problem_block", "key": "pb_1", "problem": "Pricing"}]
+    db = _ThemesDB([_response(1, "s1", "price too expensive"), _response(2, "s1", "expensive price monthly"),
+                    _response(3, "s2", "noisy notifications"), _response(4, "s2", "notifications noisy alerts")],
+                   {"s1": questions, "s2": questions})
+    log = []
+    stats = themes.run_batch(db, str(tmp_path), log=log.append)
+    assert (stats["processed"], stats["unchanged"]) == (2, 0)
+    s1 = themes.load_cached("s1", str(tmp_path))
+    assert s1["problems"]["pb_1"]["problem"] == "Pricing"
+    assert s1["problems"]["pb_1"]["responses"] == 2 and s1["fingerprint"] == themes.fingerprint(["h1", "h2"])
+
+    # nothing changed: no answers are read again
+    db.answer_reads.clear()
+    stats = themes.run_batch(db, str(tmp_path), log=log.append)
+    assert (stats["processed"], stats["unchanged"]) == (0, 2)
+    assert db.answer_reads == []
+
+    # an edited answer (new hash) only reprocesses its own session
+    db.responses[2] = {**_response(3, "s2", "alerts wake me up"), "answer_hash": "h3-edited"}
+    stats = themes.run_batch(db, str(tmp_path), log=log.append)
+    assert (stats["processed"], stats["unchanged"]) == (1, 1)
+    assert db.answer_reads == ["s2"]
+    assert themes.load_cached("s2", str(tmp_path))["fingerprint"] == themes.fingerprint(["h3-edited", "h4"])
+
+    assert themes.run_batch(db, str(tmp_path), force=True, log=log.append)["processed"] == 2
+
+
+def test_extract_themes_groups_recurring_answers():
+    found = themes.extract_themes(["price too expensive", "expensive price monthly", "noisy notifications",
+                                   "notifications noisy alerts", "weather forecast rain"])
+    assert sorted(sorted(t["terms"]) for t in found) == [["expensive", "price"], ["noisy", "notifications"]]
+    # the lone "weather" answer is its own cluster and is not surfaced
+    assert all(t["responses"] >= themes.MIN_THEME_SIZE for t in found)
+    assert sum(t["responses"] for t in found) == 4
+
+
+def test_extract_themes_needs_more_than_one_answer():
+    assert themes.extract_themes(["only one answer here"]) == []
+    assert themes.extract_themes(["", "   "]) == []
+
+
+def test_cache_path_rejects_traversal(tmp_path):
+    for bad in ("../../etc/passwd", "a/b", "..", "", "x" * 65, "id.json"):
+        with pytest.raises(ValueError):
+            themes.load_cached(bad, str(tmp_path))
+    assert themes.load_cached("0b9c6f1e-3a6d-4c8e-9f59-0a1b2c3d4e5f", str(tmp_path)) is None
@@ -80,6 +80,23 @@ export async function postResponseFile(payload: {
   return data;
 }
 
+/** Idempotency-Key per submit attempt: resubmitting the same payload (retry after a timeout or
+ *  network error) reuses the key, so the backend returns the first result instead of writing again;
+ *  changed answers get a new key. */
+let lastSubmit: { body: string; key: string } | null = null;
+
+function newIdempotencyKey(): string {
+  const c = (globalThis as any).crypto;
+  if (c?.randomUUID) return c.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+}
+
+function idempotencyKeyFor(payload: unknown): string {
+  const body = JSON.stringify(payload);
+  if (!lastSubmit || lastSubmit.body !== body) lastSubmit = { body, key: newIdempotencyKey() };
+  return lastSubmit.key;
+}
+
 /** New Supabase flow submit */
 export async function postResponsesSB(payload: {
   session_id: string;
@@ -87,7 +104,9 @@ export async function postResponsesSB(payload: {
   tester_handle?: string;
   answers: Record<string, unknown>;
 }): Promise<{ ok: boolean; hashes: { sha256: string; keccak: string } }> {
-  const { data } = await api.post("/responses_sb", payload);
+  const { data } = await api.post("/responses_sb", payload, {
+    headers: { "Idempotency-Key": idempotencyKeyFor(payload) },
+  });
   return data;
 }
 
@@ -1,5 +1,5 @@
 // miniapp/src/pages/FounderDashboard.tsx
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import { buildBrowserPreview } from "../lib/tg";
 import { useNavigate } from "react-router-dom";
 import { supabase } from "../lib/supabase";
@@ -7,6 +7,8 @@ import { connectWallet, disconnectWallet } from "../lib/nearWallet";
 
 const API = import.meta.env.VITE_BACKEND_URL as string;
 const BOT = (import.meta.env as any).VITE_BOT_USERNAME as string | undefined;
+// with the live feed, its first event (resync) triggers the snapshot fetch
+const LIVE = typeof EventSource !== "undefined";
 
 type SessionRow = {
   id: string;
@@ -37,6 +39,8 @@ export default function FounderDashboard() {
   const [copiedSid, setCopiedSid] = useState<string | null>(null);
   const [err, setErr] = useState<string | null>(null);
   const [walletConnected, setWalletConnected] = useState<string | null>(null);
+  const [reloadKey, setReloadKey] = useState(0);
+  const loadedKey = useRef(0);
 
   // Wallet connection functions
   async function onConnectWallet() {
@@ -113,6 +117,9 @@ export default function FounderDashboard() {
 
   useEffect(() => {
     if (!signedIn || !email) return;
+    // live: only fetch when the stream asked for it (one fetch per connection / resync)
+    if (LIVE && reloadKey === loadedKey.current) return;
+    loadedKey.current = reloadKey;
     (async () => {
       setLoading(true);
       try {
@@ -151,6 +158,38 @@ export default function FounderDashboard() {
         setLoading(false);
       }
     })();
+  }, [signedIn, email, reloadKey]);
+
+  // Live updates: apply per-session deltas pushed by the backend instead of polling
+  useEffect(() => {
+    if (!signedIn || !email || !LIVE) return;
+    setLoading(true);
+    let synced = false;
+    const es = new EventSource(
+      `${API}/founder_sessions/stream?founder_email=${encodeURIComponent(normEmail(email))}`
+    );
+    // stream unreachable before its first resync: load the snapshot once without it
+    es.onerror = () => {
+      if (!synced) { synced = true; setReloadKey((k) => k + 1); }
+    };
+    es.addEventListener("response", (ev) => {
+      try {
+        const d = JSON.parse((ev as MessageEvent).data);
+        setSessions((prev) =>
+          prev.map((s) =>
+            s.id !== d.session_id
+              ? s
+              : {
+                  ...s,
+                  responses_count: (s.responses_count ?? 0) + Number(d.responses_delta || 0),
+                  last_response_at: d.last_response_at || s.last_response_at,
+                }
+          )
+        );
+      } catch {}
+    });
+    es.addEventListener("resync", () => { synced = true; setReloadKey((k) => k + 1); });
+    return () => es.close();
   }, [signedIn, email]);
 
   const shown = useMemo(
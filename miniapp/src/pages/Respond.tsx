@@ -1,6 +1,6 @@
 // miniapp/src/pages/Respond.tsx
 import { useEffect, useMemo, useState } from "react";
-import { api } from "../lib/api";
+import { api, postResponsesSB } from "../lib/api";
 import type { Step } from "../types";
 import { connectWallet, disconnectWallet } from "../lib/nearWallet";
 import { getStartSid } from "../lib/tg";
@@ -220,7 +220,8 @@ export default function Respond() {
         }
       }
       
-      await api.post("/responses_sb", { session_id: sid, tester_email: email, answers });
+      // same key as a previous attempt with these answers, so a retry after a timeout is not a second write
+      await postResponsesSB({ session_id: sid, tester_email: email, answers });
       setDone(true);
     } catch (e: any) {
       setErr(e?.response?.data?.detail || e.message || "Submit failed");
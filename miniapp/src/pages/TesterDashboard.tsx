@@ -25,8 +25,8 @@ type TesterResponse = {
   id: string;
   session_id: string;
   created_at: string;
-  answer_hash: string;
-  answers: any;
+  answer_hash?: string; // not requested by the list view (fields=)
+  answers?: any;
   founder_email: string;
   company_name: string;
   problem_domain: string;
@@ -131,7 +131,9 @@ export default function TesterDashboard() {
         setQuestionnaires(qData.questionnaires || []);
 
         // Get completed responses
-        const rRes = await fetch(`${API}/tester_responses?tester_email=${encodeURIComponent(e)}`);
+        // only the columns the list renders (no answers / founder_inputs blobs)
+        const rFields = "id,session_id,created_at,founder_email,company_name,problem_domain,session_status,payment_amount,paid";
+        const rRes = await fetch(`${API}/tester_responses?tester_email=${encodeURIComponent(e)}&fields=${rFields}`);
         if (!rRes.ok) {
           const j = await rRes.json().catch(() => ({}));
           throw new Error(j?.detail || `HTTP ${rRes.status}`);